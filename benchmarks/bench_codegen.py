@@ -0,0 +1,65 @@
+"""Generated python validator vs is_valid_env on a large description.
+
+    python benchmarks/bench_codegen.py [--keys N] [--number N]
+
+is_valid_env compiles the description on every call, the compiled schema
+skips that, and the generated module also drops the per-rule dispatch.
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from env_should_be.codegen import generate_python
+from env_should_be.utils import compile_description
+from env_should_be.utils import is_valid_env
+
+RULE_SETS = [
+    {"regex": "^[a-z0-9-]+$", "min_length": 3, "max_length": 32},
+    {"option": ["dev", "staging", "prod"]},
+    {"is_https": True},
+    {"length": 4, "regex": "^[0-9]+$"},
+    {"constant": "redis://cache:6379/1", "required": False},
+]
+VALUES = ["svc-name", "prod", "https://example.com/health",
+          "5432", "redis://cache:6379/1"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=500)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    description = {
+        f"KEY_{index:04}": RULE_SETS[index % len(RULE_SETS)] for index in range(args.keys)
+    }
+    env = {
+        f"KEY_{index:04}": VALUES[index % len(VALUES)]
+        for index in range(args.keys)
+    }
+    # a few failures so the error path is exercised too
+    env["KEY_0001"] = "qa"
+    env["KEY_0003"] = "543"
+
+    schema = compile_description(description)
+    namespace: dict = {}
+    exec(generate_python(schema), namespace)
+    generated = namespace["validate"]
+    expected = is_valid_env(description, env)
+    assert generated(env) == expected == schema.validate(env)
+
+    timings = {
+        "is_valid_env": timeit.timeit(lambda: is_valid_env(description, env), number=args.number),
+        "compiled schema": timeit.timeit(lambda: schema.validate(env), number=args.number),
+        "generated python": timeit.timeit(lambda: generated(env), number=args.number),
+    }
+    baseline = timings["is_valid_env"]
+    print(f"{args.keys} keys, {args.number} runs")
+    for label, seconds in timings.items():
+        per_call = seconds / args.number * 1e6
+        print(f"{label:<18} {per_call:>10.1f} us/call {baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Throughput and peak memory of the .env parser on large generated files.
+
+    python benchmarks/bench_env_file.py [--entries N]
+
+The legacy parser (``line.strip().split("=")`` into a dict) is measured on
+the same file with every value free of ``=`` so that it does not crash.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from env_should_be.utils import iter_env_file
+from env_should_be.utils import load_env_file
+
+
+def generate(path: str, entries: int) -> None:
+    with open(path, "w") as file:
+        for index in range(entries):
+            if index % 10 == 0:
+                file.write(f"# section {index}\n\n")
+            file.write(f"SERVICE_{index:06}_TOKEN=tok{index:0>48}\n")
+
+
+def legacy_load(path: str) -> dict:
+    env_vars = {}
+    with open(path) as file:
+        for line in file:
+            if not line.startswith("#") and line.strip():
+                key, value = line.strip().split("=")
+                env_vars[key] = value
+    return env_vars
+
+
+def measure(label: str, func) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:>9.1f} ms {peak / 2**20:>9.2f} MiB peak ({result})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".env")
+    os.close(fd)
+    try:
+        generate(path, args.entries)
+        print(f"{args.entries} entries, {os.path.getsize(path) / 2**20:.1f} MiB")
+        measure("legacy split into dict", lambda: len(legacy_load(path)))
+        measure("load_env_file (dict)", lambda: len(load_env_file(path)))
+        measure(
+            "iter_env_file (streamed)",
+            lambda: sum(1 for _ in iter_env_file(path)),
+        )
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
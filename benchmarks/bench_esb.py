@@ -0,0 +1,74 @@
+"""Cold load of a large description: yaml and json sources vs a compiled .esb.
+
+    python benchmarks/bench_esb.py [--keys N] [--repeat R]
+
+Each round starts from an empty rule intern table, so every rule is built
+again, as at container start. regex rules are compiled on first use, so the
+second column (load, then validate an env that sets every key) shows what
+is left once they all ran.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import timeit
+
+from env_should_be.esb import write_esb
+from env_should_be.utils import compile_description
+from env_should_be.utils import interned
+from env_should_be.utils import load_schema
+
+
+def generate(keys: int) -> dict:
+    return {
+        f"SERVICE_{index:05}_URL": {
+            "regex": f"^https://svc-{index}\\.internal(:[0-9]+)?/.*$",
+            "min_length": 12,
+            "option": [f"https://svc-{index}.internal/", f"https://svc-{index}.internal:8443/"],
+            "required": bool(index % 2),
+        }
+        for index in range(keys)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    import yaml
+
+    description = generate(args.keys)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {extension: os.path.join(directory, f"desc{extension}")
+                 for extension in (".yml", ".json", ".esb")}
+        with open(paths[".yml"], "w") as file:
+            yaml.safe_dump(description, file)
+        with open(paths[".json"], "w") as file:
+            json.dump(description, file)
+        write_esb(paths[".esb"], compile_description(description))
+
+        env = {key: f"https://svc-{index}.internal/"
+               for index, key in enumerate(description)}
+        print(f"{args.keys} keys          load   load+validate")
+        timings = {}
+        for extension, path in paths.items():
+            def load():
+                interned.clear()
+                return load_schema(path)
+
+            timings[extension] = min(
+                timeit.repeat(load, number=1, repeat=args.repeat))
+            validated = min(timeit.repeat(
+                lambda: load().validate(env), number=1, repeat=args.repeat))
+            print(f"  {extension:>5}: {timings[extension] * 1e3:8.1f} ms {validated * 1e3:8.1f} ms"
+                  f"  ({os.path.getsize(path) / 1024:.0f} KiB)")
+        print(
+            f"  .esb loads {timings['.json'] / timings['.esb']:.1f}x faster than .json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Fleet mode throughput on a generated tree of per-service env files.
+
+    python benchmarks/bench_fleet.py [--services N] [--keys N] [--jobs N ...]
+
+Compares one cli invocation per file (sampled, then extrapolated) with
+`fleet` run in-process and across process pools of different sizes.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from env_should_be.fleet import compile_fleet_validator
+from env_should_be.fleet import find_env_files
+from env_should_be.fleet import validate_fleet
+
+SAMPLED_INVOCATIONS = 20
+
+
+def make_tree(root: str, services: int, keys: int) -> str:
+    description = {
+        f"KEY_{index:03}": {"regex": "^[a-z0-9-]+$", "min_length": 3} for index in range(keys)
+    }
+    path = os.path.join(root, "description.json")
+    with open(path, "w") as file:
+        json.dump(description, file)
+    for service in range(services):
+        directory = os.path.join(root, "services", f"svc-{service:05}")
+        os.makedirs(directory)
+        with open(os.path.join(directory, ".env"), "w") as file:
+            for index in range(keys):
+                # every 7th service has one bad value
+                value = "BAD VALUE" if service % 7 == 0 and index == 0 else f"value-{index}"
+                file.write(f"KEY_{index:03}={value}\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--services", type=int, default=3000)
+    parser.add_argument("--keys", type=int, default=40)
+    parser.add_argument("--jobs", type=int, nargs="+",
+                        default=sorted({1, 2, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        description = make_tree(root, args.services, args.keys)
+        paths = find_env_files(root)
+
+        start = time.perf_counter()
+        for path in paths[:SAMPLED_INVOCATIONS]:
+            subprocess.run(
+                [sys.executable, "-m", "env_should_be.cli",
+                 "-d", description, "-e", path, "-fs", "1"],
+                capture_output=True,
+            )
+        sampled = min(SAMPLED_INVOCATIONS, len(paths))
+        per_file = (time.perf_counter() - start) / sampled
+        print(f"{len(paths)} env files x {args.keys} keys")
+        print(
+            f"  one cli run per file   ~{per_file * len(paths):7.2f} s (extrapolated)")
+
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            validator = compile_fleet_validator([description])
+            results = validate_fleet(paths, validator, jobs=jobs)
+            failing = sum(not result.ok for result in results)
+            seconds = time.perf_counter() - start
+            print(f"  fleet --jobs {jobs:<10} {seconds:7.2f} s "
+                  f"({len(paths) / seconds:7.0f} files/s, {failing} failing)")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Per-call cost of the built-in format checks.
+
+Compares the precompiled patterns used by the format descriptions with the
+previous behaviour, which built a new Regex description (and ran
+``re.compile`` in its setter plus ``re.match`` through the global cache) on
+every ``does_pass`` call.
+
+    python benchmarks/bench_formats.py [--number N]
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import timeit
+
+from env_should_be.description import IsEmail
+from env_should_be.description import IsHttp
+from env_should_be.description import IsHttps
+from env_should_be.description import IsIpv4
+from env_should_be.description import IsIpv6
+from env_should_be.description import IsUuid
+
+SAMPLES = {
+    IsHttp: ["http://internal.website.something.com.eu", "htt://gitlab.com"],
+    IsHttps: ["https://github.com/wassef911", "http://github.com"],
+    IsIpv4: ["192.168.0.1", "1278.0.0.1"],
+    IsIpv6: ["2001:0db8:85a3:0000:0000:8a2e:0370:7334", "127.0.0.1"],
+    IsEmail: ["first.last@example.com", "not-an-email"],
+    IsUuid: ["9e107d9d-12b1-4efc-9e88-df2c99bcb8dd", "9e107d9d12b14efc"],
+}
+
+
+def legacy_does_pass(pattern: str, actual) -> bool:
+    # what every format check did before: compile-validate then re.match
+    re.compile(pattern)
+    return isinstance(actual, str) and re.match(pattern, actual) != None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{'check':<10} {'legacy (us)':>12} {'current (us)':>13} {'speedup':>8}")
+    for klass, values in SAMPLES.items():
+        rule = klass(True)
+        pattern = klass.regex
+
+        def legacy():
+            for value in values:
+                legacy_does_pass(pattern, value)
+
+        def current():
+            for value in values:
+                rule.does_pass(value)
+
+        calls = args.number * len(values)
+        before = timeit.timeit(legacy, number=args.number) / calls * 1e6
+        after = timeit.timeit(current, number=args.number) / calls * 1e6
+        print(
+            f"{klass.__name__:<10} {before:>12.3f} {after:>13.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
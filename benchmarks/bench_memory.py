@@ -0,0 +1,83 @@
+"""Memory held by a compiled description, with and without shared rules.
+
+    python benchmarks/bench_memory.py [--keys N] [--rounds N]
+
+Measured with tracemalloc: what a compiled schema retains, and the peak of
+short-lived allocations while validating it over and over.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+
+from env_should_be.utils import compile_description
+from env_should_be.utils import CompiledDescription
+from env_should_be.utils import CompiledKey
+from env_should_be.utils import RULES
+
+RULE_SET = {"is_int": True, "is_number": True,
+            "is_greater_than_eq": 1, "is_lower_than_eq": 65535}
+
+
+def compile_unshared(description: dict) -> CompiledDescription:
+    "What compile_description did before rules were interned."
+    return CompiledDescription(
+        keys=tuple(
+            CompiledKey(
+                name=key,
+                required=True,
+                rules=tuple((name, RULES[name](value))
+                            for name, value in values.items()),
+            )
+            for key, values in description.items()
+        )
+    )
+
+
+def retained(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, after - before
+
+
+def transient_peak(schema: CompiledDescription, env: dict, rounds: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in range(rounds):
+        schema.validate(env)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    description = {
+        f"PORT_{index:04}": dict(RULE_SET) for index in range(args.keys)
+    }
+    env = {key: 8000 + index for index, key in enumerate(description)}
+
+    unshared, unshared_bytes = retained(lambda: compile_unshared(description))
+    shared, shared_bytes = retained(lambda: compile_description(description))
+    rules = len(RULE_SET) * args.keys
+    print(f"{args.keys} keys, {rules} rules")
+    print(f"  retained, one object per rule: {unshared_bytes / 1024:8.1f} KiB")
+    print(f"  retained, shared rules:        {shared_bytes / 1024:8.1f} KiB")
+    print(f"  validation peak over {args.rounds} rounds: "
+          f"{transient_peak(shared, env, args.rounds) / 1024:.1f} KiB")
+    assert unshared.validate(env) == shared.validate(env) == True
+
+
+if __name__ == "__main__":
+    main()
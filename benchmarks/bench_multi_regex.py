@@ -0,0 +1,61 @@
+"""Regexes layered on the same keys: one combined pass vs one match each.
+
+    python benchmarks/bench_multi_regex.py [--keys N] [--number N]
+
+Every key gets one pattern from each of several description layers, as
+happens with base/team/service descriptions.
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from env_should_be.utils import build_rule_index
+from env_should_be.utils import compile_description
+
+SCENARIOS = {
+    "password policy": (
+        ["^(?=.*[A-Z])", "^(?=.*[a-z])", "^(?=.*[0-9])", "^(?=.*[^A-Za-z0-9])",
+         "^.{12,64}$", "^[^\\s]+$"],
+        ["CorrectHorse9Battery!", "password", "Tr0ub4dor&3xyz", "with space 1A!"],
+    ),
+    "url prefixes": (
+        ["^postgres(ql)?://", "^[a-z]+://[^/]+:[0-9]+/",
+         "^[^ ]+$", "^.{0,255}$"],
+        ["postgres://db:5432/app", "mysql://db:3306/app", "postgres://db/app"],
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=200)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    keys = [f"KEY_{index:04}" for index in range(args.keys)]
+    for scenario, (layers, values) in SCENARIOS.items():
+        schemas = [
+            compile_description({key: {"regex": pattern} for key in keys}) for pattern in layers
+        ]
+        env = {key: values[index % len(values)]
+               for index, key in enumerate(keys)}
+        combined = build_rule_index(schemas)
+        separate = build_rule_index(schemas, combine_regexes=False)
+        assert combined.validate(env) == separate.validate(env)
+
+        # attribution is the same for both, only time the rule evaluation
+        timings = {
+            name: min(timeit.repeat(
+                lambda: index.outcomes(env), number=args.number, repeat=9))
+            for name, index in [("one match per pattern", separate), ("combined per key", combined)]
+        }
+        checks = args.keys * len(layers)
+        print(f"{scenario}: {args.keys} keys x {len(layers)} layered regexes")
+        for name, seconds in timings.items():
+            print(f"  {name:<22} {seconds / args.number * 1e3:8.3f} ms/round "
+                  f"({seconds / args.number / checks * 1e9:6.0f} ns/check)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Throughput and peak memory of the report formats on many failing results.
+
+    python benchmarks/bench_reporter.py [--envs N] [--keys N]
+
+Each env fails every key on two rules, reports go to /dev/null. The peak is
+measured with tracemalloc and should not grow with --envs, the logging loop
+the reporters replaced is timed for reference.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import time
+import tracemalloc
+
+from env_should_be.reporter import get_reporter
+from env_should_be.utils import VariableError
+
+
+def errors_for(keys: int) -> list[VariableError]:
+    return [VariableError("desc.yml", [[f"KEY_{index}", ["length", "regex"]]
+                                       for index in range(keys)])]
+
+
+def run_reporter(format: str, envs: int, errors: list[VariableError]) -> None:
+    reporter = get_reporter(format, os.devnull, ["desc.yml"], fleet=True)
+    for index in range(envs):
+        reporter.report(f"service_{index}/.env", errors)
+    reporter.close()
+
+
+def run_logging(envs: int, errors: list[VariableError]) -> None:
+    logger = logging.getLogger("bench_reporter")
+    logger.propagate = False
+    handler = logging.FileHandler(os.devnull)
+    handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+    logger.addHandler(handler)
+    for index in range(envs):
+        for e in errors:
+            logger.warning(
+                f"service_{index}/.env: Env Not matching {e.description_path}")
+            for variable, fails in e.errors:
+                logger.error(f"\n {variable}, failing to match {fails}")
+    logger.removeHandler(handler)
+    handler.close()
+
+
+def measure(run) -> tuple[float, int]:
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    run()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--envs", type=int, default=20_000)
+    parser.add_argument("--keys", type=int, default=50)
+    args = parser.parse_args()
+
+    errors = errors_for(args.keys)
+    results = args.envs * args.keys * 2
+    print(f"{args.envs} envs x {args.keys} keys, {results} (env, key, rule) results")
+    for format in ("text", "json", "jsonl", "junit"):
+        elapsed, peak = measure(
+            lambda: run_reporter(format, args.envs, errors))
+        print(f"{format:>8}: {elapsed:7.3f}s  peak {peak / 1024:8.1f} KiB")
+    elapsed, peak = measure(lambda: run_logging(args.envs, errors))
+    print(f"{'logging':>8}: {elapsed:7.3f}s  peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Import-time cost of the env_should_be console script.
+
+Runs ``python -X importtime -c "import env_should_be.cli"`` in fresh
+interpreters and reports the median cumulative import time of the package
+together with its heaviest imports. It exits non-zero when the median goes
+over --max-ms or when a module that should stay lazy gets imported, so it
+can guard CI against regressions.
+
+    python benchmarks/bench_startup.py [--runs N] [--max-ms MS]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# only needed off the happy path, see the note at the top of cli.py
+LAZY_MODULES = (
+    "yaml",
+    "subprocess",
+    "logging",
+    "json",
+    "hashlib",
+    "pickle",
+    "tempfile",
+    "concurrent.futures",
+    "multiprocessing",
+    "threading",
+    "numpy",
+)
+
+
+def import_times(target: str) -> dict[str, int]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, us_cumulative, name = line[len("import time:"):].split("|")
+        if us_cumulative.strip().isdigit():
+            cumulative[name.strip()] = int(us_cumulative)
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--target", default="env_should_be.cli")
+    parser.add_argument("--max-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times(args.target) for _ in range(args.runs)]
+    totals = [run[args.target] / 1000 for run in runs]
+    median = statistics.median(totals)
+    print(f"{args.target}: median {median:.1f} ms, min {min(totals):.1f} ms over {args.runs} runs")
+
+    last = runs[-1]
+    print("heaviest imports (last run):")
+    for name, us in sorted(last.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {us / 1000:>7.1f} ms  {name}")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in last]
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if args.max_ms != None and median > args.max_ms:
+        print(f"FAIL: median {median:.1f} ms is over --max-ms {args.max_ms}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Pure-Python SafeLoader vs libyaml's CSafeLoader on large descriptions.
+
+    python benchmarks/bench_yaml.py [--keys N] [--repeat R]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import timeit
+
+import yaml
+from env_should_be.utils import get_yaml_loader
+
+
+def generate(path: str, keys: int) -> None:
+    with open(path, "w") as file:
+        for index in range(keys):
+            file.write(
+                f"SERVICE_{index:05}_URL:\n"
+                f"  regex: \"^https://svc-{index}\\\\.internal(:[0-9]+)?/.*$\"\n"
+                f"  min_length: 12\n"
+                f"  option:\n"
+                f"    - https://svc-{index}.internal/\n"
+                f"    - https://svc-{index}.internal:8443/\n"
+                f"  required: {'true' if index % 2 else 'false'}\n"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".yml")
+    os.close(fd)
+    try:
+        generate(path, args.keys)
+        print(f"{args.keys} keys, {os.path.getsize(path) / 2**20:.1f} MiB")
+        print(f"load_yaml_file picks {get_yaml_loader().__name__}")
+        loaders = [yaml.SafeLoader]
+        if hasattr(yaml, "CSafeLoader"):
+            loaders.append(yaml.CSafeLoader)
+        else:
+            print("PyYAML was built without libyaml, CSafeLoader unavailable")
+
+        timings = {}
+        for loader in loaders:
+            def load(loader=loader):
+                with open(path) as file:
+                    yaml.load(file, Loader=loader)
+
+            timings[loader] = min(timeit.repeat(
+                load, number=1, repeat=args.repeat))
+            print(f"{loader.__name__:<12} {timings[loader] * 1000:>9.1f} ms")
+        if len(timings) == 2:
+            print(
+                f"speedup: {timings[yaml.SafeLoader] / timings[yaml.CSafeLoader]:.1f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
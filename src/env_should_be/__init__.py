@@ -1,3 +1,17 @@
 from __future__ import annotations
 
 __version__ = "0.2.7"
+
+
+def ensure(descriptions, cache_dir=None, raise_on_error=True, coerce=False, export=False):
+    "Validates os.environ in-process, see env_should_be.runtime.ensure."
+    # imported here so that the console script's cold start stays light
+    from .runtime import ensure
+
+    return ensure(
+        descriptions,
+        cache_dir=cache_dir,
+        raise_on_error=raise_on_error,
+        coerce=coerce,
+        export=export,
+    )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+
+from . import utils
+from .exception import CallBackNotRunning
+from .utils import build_rule_index
+from .utils import collect_errors
+from .utils import CompiledDescription
+from .utils import ResultCache
+from .utils import VariableError
+
+# asyncio counterparts of the loaders in utils: blocking reads and parsing
+# run on the default executor so slow filesystems don't stall the loop
+
+
+async def load_env_file(file_path: str) -> dict:
+    return await asyncio.to_thread(utils.load_env_file, file_path)
+
+
+async def load_yaml_file(file_path: str) -> dict:
+    return await asyncio.to_thread(utils.load_yaml_file, file_path)
+
+
+async def load_json_file(file_path: str) -> dict:
+    return await asyncio.to_thread(utils.load_json_file, file_path)
+
+
+async def load_schema(path: str, cache_dir: str | None = None) -> CompiledDescription:
+    return await asyncio.to_thread(utils.load_schema, path, cache_dir)
+
+
+async def get_errors_for(
+    env: dict,
+    descriptions: list[str],
+    cache_dir: str | None = None,
+    result_cache: ResultCache | None = None,
+    coerce: bool = False,
+    regex_timeout: float | None = None,
+) -> list[VariableError]:
+    loaded = await asyncio.gather(
+        *(load_schema(path, cache_dir) for path in descriptions),
+        return_exceptions=True,
+    )
+    for schema in loaded:
+        # same failure as the sync version: the first one in argument order
+        if isinstance(schema, BaseException):
+            raise schema
+    index = build_rule_index(loaded, combine_regexes=regex_timeout == None)
+    outcomes = await asyncio.to_thread(
+        index.outcomes, env, cache=result_cache, coerce=coerce, regex_timeout=regex_timeout
+    )
+    return collect_errors(descriptions, index.attribute(env, outcomes))
+
+
+async def run_callback(
+    callback: str, payload: bytes = b"", timeout: float | None = None
+) -> int | None:
+    "Exit code of the callback, None when it was killed after timeout seconds."
+    try:
+        process = await asyncio.create_subprocess_exec(
+            callback, stdin=asyncio.subprocess.PIPE
+        )
+    except Exception as exc:
+        raise CallBackNotRunning(
+            f"couldn't the callback script: {callback}, {exc}")
+    try:
+        await asyncio.wait_for(process.communicate(payload), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return None
+    return process.returncode
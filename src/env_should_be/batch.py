@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+from typing import Iterable
+
+from .utils import coerce_value
+from .utils import compile_description
+from .utils import CompiledDescription
+from .utils import ResultCache
+
+# one status byte per (env, key, rule) cell
+FAILED = 0
+PASSED = 1
+SKIPPED = 2  # optional variable not set
+MISSING = 3  # required variable not set
+
+
+@dataclass(frozen=True)
+class ResultMatrix:
+    columns: tuple[tuple[str, str], ...]
+    cells: bytes  # row major, len(columns) statuses per env
+
+    def row(self, index: int) -> bytes:
+        width = len(self.columns)
+        return self.cells[index * width: (index + 1) * width]
+
+    def is_valid(self, index: int) -> bool:
+        row = self.row(index)
+        return FAILED not in row and MISSING not in row
+
+    def errors(self, index: int) -> list[list[Any]]:
+        "Same shape as is_valid_env, without raising for missing variables."
+        invalid_vars: dict[str, list[str]] = {}
+        for (key, rule), status in zip(self.columns, self.row(index)):
+            if status == FAILED:
+                invalid_vars.setdefault(key, []).append(rule)
+        return sorted([key, fails] for key, fails in invalid_vars.items())
+
+    def missing(self, index: int) -> list[str]:
+        return sorted(
+            {key for (key, _), status in zip(
+                self.columns, self.row(index)) if status == MISSING}
+        )
+
+
+def validate_many(
+    description: dict | CompiledDescription,
+    envs: Iterable[dict],
+    cache: ResultCache | None = None,
+    coerce: bool = False,
+) -> ResultMatrix:
+    if not isinstance(description, CompiledDescription):
+        description = compile_description(description)
+    envs = list(envs)
+    columns = [
+        (key.name, name) for key in description.keys for name, _ in key.rules
+    ]
+    width = len(columns)
+    cells = bytearray(width * len(envs))
+    column = 0
+    for key in description.keys:
+        values = [env.get(key.name, None) for env in envs]
+        present = [
+            index for index, value in enumerate(values) if value != None]
+        actuals = [values[index] for index in present]
+        typed = None  # the coerced column, parsed at most once per key
+        unset = bytes([MISSING if key.required else SKIPPED]) * len(envs)
+        for _, rule in key.rules:
+            statuses = bytearray(unset)
+            column_values = actuals
+            if coerce and rule.typed:
+                if typed == None:
+                    typed = [coerce_value(actual) for actual in actuals]
+                column_values = typed
+            outcomes = (
+                cache.does_pass_many(rule, column_values)
+                if cache != None
+                else rule.does_pass_many(column_values)
+            )
+            for index, passed in zip(present, outcomes):
+                statuses[index] = PASSED if passed else FAILED
+            cells[column::width] = statuses
+            column += 1
+    return ResultMatrix(columns=tuple(columns), cells=bytes(cells))
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import tempfile
+import time
+
+from .exception import CallBackNotRunning
+from .reporter import error_as_dict
+from .utils import VariableError
+
+
+def errors_to_payload(errors: list[VariableError]) -> bytes:
+    "What callbacks receive on stdin, so they don't have to re-validate."
+    return json.dumps({"errors": [error_as_dict(error) for error in errors]}).encode()
+
+
+def run_callbacks(
+    callbacks: list[str],
+    payload: bytes = b"",
+    timeout: float | None = None,
+    detach: bool = False,
+) -> list[int | None]:
+    """Starts every callback at once and returns their exit codes, None for
+    the ones killed after timeout seconds or left running when detached."""
+    processes: list[subprocess.Popen] = []
+    for callback in callbacks:
+        # a file rather than a pipe: a callback that never reads its stdin
+        # can't block us, and detached ones can read it after we are gone
+        with tempfile.TemporaryFile() as stdin:
+            stdin.write(payload)
+            stdin.seek(0)
+            try:
+                processes.append(
+                    subprocess.Popen(
+                        [callback], stdin=stdin, start_new_session=detach)
+                )
+            except Exception as exc:
+                raise CallBackNotRunning(
+                    f"couldn't the callback script: {callback}, {exc}"
+                )
+    if detach:
+        return [None] * len(processes)
+    deadline = None if timeout == None else time.monotonic() + timeout
+    codes: list[int | None] = []
+    for process in processes:
+        remaining = None if deadline == None else max(
+            deadline - time.monotonic(), 0)
+        try:
+            codes.append(process.wait(remaining))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            codes.append(None)
+    return codes
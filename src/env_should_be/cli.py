@@ -2,26 +2,25 @@
 from __future__ import annotations
 
 import argparse
-import logging
-import subprocess
-from json.decoder import JSONDecodeError
-from typing import List
+import os
+import sys
+from time import perf_counter
 
-from .exception import CallBackNotRunning
 from .exception import EnvironmentFileNotLoading
-from .utils import *
+from .utils import CACHE_ENV_VAR
+from .utils import get_errors_for
+from .utils import load_all_env_vars
+from .utils import load_env_file
 
-logging.basicConfig(
-    level=logging.INFO,  # Adjust the log level as needed
-    format="%(levelname)s: %(message)s",
-)
+# this runs before every container's real process, so anything not needed
+# on the happy path (logging, subprocess, yaml, ...) is imported lazily
 
 arguments = [
     {
         "dest": "description",
         "option_strings": ["-d", "--description"],
         "nargs": "+",
-        "help": "<Required> either one or multiple paths for description files.",
+        "help": "<Required> either one or multiple paths for description files (json/yml, or .esb once compiled).",
         "required": True,
     },
     {
@@ -43,55 +42,453 @@ arguments = [
     {
         "dest": "callback",
         "option_strings": ["-cb", "--callback"],
+        "nargs": "+",
+        "help": "<Optional> one or multiple callback scripts to be executed (concurrently) when an environment fails to match a description, the failing keys are passed as json on their stdin. (still triggered on fail-silently)",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "callback_timeout",
+        "option_strings": ["-cbt", "--callback-timeout"],
+        "type": float,
+        "help": "<Optional> seconds to wait for the callback(s) before killing them (default: wait indefinitely).",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "detach_callback",
+        "option_strings": ["-cbd", "--detach-callback"],
+        "action": "store_true",
+        "help": "<Optional> start the callback(s) in their own session and exit without waiting for them.",
+        "required": False,
+    },
+    {
+        "dest": "cache_dir",
+        "option_strings": ["-cd", "--cache-dir"],
         "type": str,
-        "help": "<Optional> a callback script to be executed an environment fails to match the a description. (still triggered on fail-silently)",
+        "help": f"<Optional> a directory where parsed description(s) are cached between runs, keyed by path, mtime and content hash (defaults to ${CACHE_ENV_VAR}).",
         "required": False,
         "default": None,
     },
+    {
+        "dest": "jobs",
+        "option_strings": ["-j", "--jobs"],
+        "type": int,
+        "help": "<Optional> number of threads used to load and validate description(s) concurrently, large descriptions are also split into chunks of keys (default 1, sequential).",
+        "required": False,
+        "default": 1,
+    },
+    {
+        "dest": "coerce",
+        "option_strings": ["--coerce"],
+        "action": "store_true",
+        "help": "<Optional> parse values that spell an int, float or bool (true/false) once per key, so is_int/is_float/is_number and the range rules can check env strings.",
+        "required": False,
+    },
+    {
+        "dest": "regex_timeout",
+        "option_strings": ["--regex-timeout"],
+        "type": float,
+        "help": "<Optional> seconds a single regex rule may run, user patterns are then matched in a worker process that is killed over budget and the rule fails as regex:timeout (default: no limit).",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "format",
+        "option_strings": ["-f", "--format"],
+        "choices": ["text", "json", "jsonl", "junit"],
+        "help": "<Optional> how failures are reported: text log lines on stderr (default), or a json document, json lines or a junit xml report on stdout.",
+        "required": False,
+        "default": "text",
+    },
+    {
+        "dest": "output",
+        "option_strings": ["-o", "--output"],
+        "type": str,
+        "help": "<Optional> write the report to this file instead.",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "stats",
+        "option_strings": ["--stats"],
+        "action": "store_true",
+        "help": "<Optional> time every file load, schema build and rule check and print a breakdown on stderr (p50/p95 per rule, slowest keys, time per file).",
+        "required": False,
+    },
+    {
+        "dest": "metrics_file",
+        "option_strings": ["--metrics-file"],
+        "type": str,
+        "help": "<Optional> atomically write validation duration, parse duration and failing keys/rules per description and schema cache hits to this file, in the prometheus text format (for node_exporter's textfile collector).",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "verbose",
+        "option_strings": ["-v", "--verbose"],
+        "action": "store_true",
+        "help": "<Optional> log debug details (e.g. which yaml loader is used).",
+        "required": False,
+    },
+    {
+        "dest": "watch",
+        "option_strings": ["-w", "--watch"],
+        "action": "store_true",
+        "help": "<Optional> keep running, re-validate only the keys touched when the description(s), the bases they extend or the env file change and log newly failing/passing keys.",
+        "required": False,
+    },
+    {
+        "dest": "watch_interval",
+        "option_strings": ["--watch-interval"],
+        "type": float,
+        "help": "<Optional> seconds between checks when inotify is unavailable and files are polled (default 1).",
+        "required": False,
+        "default": 1.0,
+    },
 ]
 
 
+def get_logger(verbose: bool = False):
+    import logging
+
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format="%(levelname)s: %(message)s",
+    )
+    return logging.getLogger()
+
+
+def watch_forever(args: Namespace, env: dict) -> None:
+    from .watch import watch
+
+    logger = get_logger(args.verbose)
+
+    def report(transitions):
+        for t in transitions:
+            if t.fails:
+                logger.error(
+                    f"{t.description_path}: {t.key} newly failing to match {t.fails}")
+            else:
+                logger.info(f"{t.description_path}: {t.key} newly passing")
+
+    def on_error(exc):
+        logger.warning(f"keeping the last valid state, {exc}")
+
+    logger.info(f"watching {', '.join(args.description)}")
+    try:
+        watch(
+            args.description,
+            args.env_file,
+            env,
+            report=report,
+            on_error=on_error,
+            interval=args.watch_interval,
+            coerce=args.coerce,
+            regex_timeout=args.regex_timeout,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
 class Namespace:
     description: list[str]
     fail_silently: bool
     env_file: bool
-    callback: str
+    callback: list[str] | None
+    callback_timeout: float | None
+    detach_callback: bool
+    cache_dir: str | None
+    jobs: int
+    coerce: bool
+    regex_timeout: float | None
+    format: str
+    output: str | None
+    stats: bool
+    metrics_file: str | None
+    verbose: bool
+    watch: bool
+    watch_interval: float
 
 
-def main():
+compile_arguments = [
+    {
+        "dest": "description",
+        "option_strings": [],
+        "help": "<Required> path of the description file to compile.",
+    },
+    {
+        "dest": "to_python",
+        "option_strings": ["--to-python"],
+        "type": str,
+        "help": "<Optional> write a dependency-free python module whose validate(env) inlines every rule.",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "output",
+        "option_strings": ["-o", "--output"],
+        "type": str,
+        "help": "<Optional> write the validated rule table to this .esb file, which -d loads without parsing or validating it again.",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "coerce",
+        "option_strings": ["--coerce"],
+        "action": "store_true",
+        "help": "<Optional> coerce values before the numeric rules, as validating with --coerce does.",
+        "required": False,
+    },
+]
+
+
+def compile_main(argv: list[str]):
+    from .utils import compile_description
+    from .utils import find_unsafe_patterns
+    from .utils import get_file_extension
+    from .utils import resolve_description
+    from .utils import warn_unsafe_patterns
+
+    parser = argparse.ArgumentParser(
+        prog="env_should_be compile",
+        description="Compile a description ahead of time.")
+    for arg in compile_arguments:
+        parser.add_argument(*arg["option_strings"], **arg)
+    args = parser.parse_args(argv)
+    if args.to_python == None and args.output == None:
+        parser.error("nothing to do, pass --to-python and/or -o")
+    if args.output != None and get_file_extension(args.output) != ".esb":
+        parser.error("-o must end with .esb, the extension -d loads it by")
+    schema = compile_description(resolve_description(args.description)[0])
+    if args.to_python != None:
+        from .codegen import generate_python
+
+        with open(args.to_python, "w") as file:
+            file.write(generate_python(
+                schema, source=args.description, coerce=args.coerce))
+    if args.output != None:
+        from .esb import write_esb
+
+        # loading an .esb skips this check, so it's done once here
+        warn_unsafe_patterns(find_unsafe_patterns(schema), args.description)
+        write_esb(args.output, schema)
+    exit(0)
+
+
+fleet_arguments = [
+    {
+        "dest": "root",
+        "option_strings": ["--root"],
+        "type": str,
+        "help": "<Optional> directory searched for env files (default: the current directory).",
+        "required": False,
+        "default": ".",
+    },
+    {
+        "dest": "glob",
+        "option_strings": ["--glob"],
+        "type": str,
+        "help": "<Optional> pattern of the env files under --root, ** spans directories (default: **/.env).",
+        "required": False,
+        "default": "**/.env",
+    },
+    {
+        "dest": "description",
+        "option_strings": ["-d", "--description"],
+        "nargs": "+",
+        "help": "<Required> either one or multiple paths for description files, every env file is validated against all of them.",
+        "required": True,
+    },
+    {
+        "dest": "jobs",
+        "option_strings": ["-j", "--jobs"],
+        "type": int,
+        "help": "<Optional> number of worker processes (default: one per cpu).",
+        "required": False,
+        "default": os.cpu_count() or 1,
+    },
+    {
+        "dest": "fail_silently",
+        "option_strings": ["-fs", "--fail-silently"],
+        "action": "store_true",
+        "help": "<Optional> return an exit status of 0 even if some env files fail to match.",
+        "required": False,
+    },
+    {
+        "dest": "cache_dir",
+        "option_strings": ["-cd", "--cache-dir"],
+        "type": str,
+        "help": f"<Optional> a directory where parsed description(s) are cached between runs (defaults to ${CACHE_ENV_VAR}).",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "coerce",
+        "option_strings": ["--coerce"],
+        "action": "store_true",
+        "help": "<Optional> same as for a single env.",
+        "required": False,
+    },
+    {
+        "dest": "regex_timeout",
+        "option_strings": ["--regex-timeout"],
+        "type": float,
+        "help": "<Optional> same as for a single env.",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "format",
+        "option_strings": ["-f", "--format"],
+        "choices": ["text", "json", "jsonl", "junit"],
+        "help": "<Optional> same as for a single env, results are streamed as env files are checked.",
+        "required": False,
+        "default": "text",
+    },
+    {
+        "dest": "output",
+        "option_strings": ["-o", "--output"],
+        "type": str,
+        "help": "<Optional> write the report to this file instead.",
+        "required": False,
+        "default": None,
+    },
+    {
+        "dest": "verbose",
+        "option_strings": ["-v", "--verbose"],
+        "action": "store_true",
+        "help": "<Optional> also report the env files that match.",
+        "required": False,
+    },
+]
+
+
+def fleet_main(argv: list[str]):
+    from .fleet import compile_fleet_validator
+    from .fleet import find_env_files
+    from .fleet import validate_fleet
+    from .reporter import get_reporter
+
+    parser = argparse.ArgumentParser(
+        prog="env_should_be fleet",
+        description="Validate every env file under a directory against the same description(s).",
+    )
+    for arg in fleet_arguments:
+        parser.add_argument(*arg["option_strings"], **arg)
+    args = parser.parse_args(argv)
+    if args.verbose:
+        get_logger(verbose=True)
+    validator = compile_fleet_validator(
+        args.description,
+        cache_dir=args.cache_dir or os.environ.get(CACHE_ENV_VAR),
+        coerce=args.coerce,
+        regex_timeout=args.regex_timeout,
+    )
+    paths = find_env_files(args.root, args.glob)
+    reporter = get_reporter(
+        args.format, args.output, args.description, verbose=args.verbose, fleet=True)
+    try:
+        for result in validate_fleet(paths, validator, jobs=args.jobs):
+            reporter.report(result.path, result.errors, result.problem)
+    finally:
+        reporter.close()
+    if reporter.failing > 0 and not args.fail_silently:
+        exit(1)
+    exit(0)
+
+
+commands = {
+    "compile": compile_main,
+    "fleet": fleet_main,
+}
+
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv == None else argv
+    if len(argv) > 0 and argv[0] in commands:
+        return commands[argv[0]](argv[1:])
     parser = argparse.ArgumentParser(
         description="How should your environment be?")
     for arg in arguments:
         parser.add_argument(*arg["option_strings"], **arg)
-    args: Namespace = parser.parse_args()
+    args: Namespace = parser.parse_args(argv)
+    if args.verbose:
+        get_logger(verbose=True)
+    started = perf_counter()
+    stats = None
+    if args.stats or args.metrics_file != None:
+        from .stats import Stats
+        from .utils import file_timing_hooks
+        from .utils import timing_hooks
+
+        stats = Stats()
+        # the metrics only need file timings, rule timing disables the combined regexes
+        hooks = timing_hooks if args.stats else file_timing_hooks
+        hooks.append(stats)
     if args.env_file:
         try:
             env = load_env_file(args.env_file)
         except (
             FileNotFoundError,
             ValueError,
-            JSONDecodeError,
         ) as exc:
             raise EnvironmentFileNotLoading(
                 f"couldn't load file at:{args.env_file}, {exc}"
             )
     else:
         env = load_all_env_vars()
-    errors = get_errors_for(env, args.description)
+    cache_dir = args.cache_dir or os.environ.get(CACHE_ENV_VAR)
+    errors = get_errors_for(
+        env,
+        args.description,
+        cache_dir=cache_dir,
+        jobs=args.jobs,
+        coerce=args.coerce,
+        regex_timeout=args.regex_timeout,
+    )
+    if stats != None:
+        hooks.remove(stats)
+    if args.stats:
+        sys.stderr.write(stats.report())
+    if args.metrics_file != None:
+        from .metrics import render_metrics
+        from .metrics import write_metrics
+
+        try:
+            write_metrics(args.metrics_file, render_metrics(
+                args.description, errors, stats, perf_counter() - started, cache_dir != None))
+        except OSError as exc:
+            # metrics are never worth blocking the container over
+            get_logger(args.verbose).warning(
+                f"couldn't write metrics to {args.metrics_file}, {exc}")
+    if len(errors) > 0 or args.format != "text":
+        from .reporter import get_reporter
+
+        reporter = get_reporter(args.format, args.output, args.description)
+        reporter.report(args.env_file, errors)
+        reporter.close()
     if len(errors) > 0:
-        for e in errors:
-            logging.warning(f"Env Not matching {e.description_path}")
-            for variable, fails in e.errors:
-                logging.error(f"\n {variable}, failing to match {fails}")
+        logger = get_logger(args.verbose)
         if args.callback != None:
-            try:
-                subprocess.run([args.callback])
-            except Exception as exc:
-                raise CallBackNotRunning(
-                    f"couldn't the callback script: {args.callback}, {exc}"
-                )
-        if not args.fail_silently:
-            exit(1)
+            from .callback import errors_to_payload
+            from .callback import run_callbacks
+
+            codes = run_callbacks(
+                args.callback,
+                errors_to_payload(errors),
+                timeout=args.callback_timeout,
+                detach=args.detach_callback,
+            )
+            if not args.detach_callback:
+                for callback, code in zip(args.callback, codes):
+                    if code == None:
+                        logger.warning(
+                            f"callback {callback} killed after {args.callback_timeout}s")
+    if args.watch:
+        watch_forever(args, env)
+    if len(errors) > 0 and not args.fail_silently:
+        exit(1)
     exit(0)
 
 
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+from typing import Callable
+
+from . import __version__
+from . import description as all_descriptions
+from .utils import BOOLEANS
+from .utils import CompiledDescription
+from .utils import FLOAT_PATTERN
+from .utils import INT_PATTERN
+
+# every emitter returns a python expression that is true when the rule
+# passes for `v`, which is already known not to be None; numeric rules
+# read emitter.typed instead, `t` (the coerced value) when coercing
+
+# same behaviour as utils.coerce_value
+COERCE_SOURCE = f"""\
+_INT = re.compile({INT_PATTERN.pattern!r})
+_FLOAT = re.compile({FLOAT_PATTERN.pattern!r})
+_BOOLEANS = {BOOLEANS!r}
+
+
+def coerce(v):
+    if not isinstance(v, str):
+        return v
+    try:
+        if _INT.match(v):
+            return int(v)
+        if _FLOAT.match(v):
+            return float(v)
+    except ValueError:
+        return v
+    return _BOOLEANS.get(v.lower(), v)"""
+
+
+def literal(value: Any) -> str:
+    if isinstance(value, float) and not math.isfinite(value):
+        return f"float({str(value)!r})"
+    return repr(value)
+
+
+class Emitter:
+    "Collects the module level constants referenced by the emitted checks."
+
+    def __init__(self, coerce: bool = False):
+        self.constants: list[str] = []
+        self.typed = "t" if coerce else "v"
+
+    def constant(self, prefix: str, source: str) -> str:
+        name = f"_{prefix}{len(self.constants)}"
+        self.constants.append(f"{name} = {source}")
+        return name
+
+    def pattern(self, regex: str) -> str:
+        return self.constant("P", f"re.compile({regex!r})")
+
+
+def emit_length(rule, emitter: Emitter) -> str:
+    return f'hasattr(v, "__len__") and len(v) == {literal(rule.value)}'
+
+
+def emit_min_length(rule, emitter: Emitter) -> str:
+    return f"isinstance(v, str) and len(v) >= {literal(rule.value)}"
+
+
+def emit_max_length(rule, emitter: Emitter) -> str:
+    return f"isinstance(v, str) and len(v) <= {literal(rule.value)}"
+
+
+def emit_regex(rule, emitter: Emitter) -> str:
+    return f"isinstance(v, str) and {emitter.pattern(rule.value)}.match(v) is not None"
+
+
+def emit_pattern_match(rule, emitter: Emitter) -> str:
+    return f"isinstance(v, str) and {emitter.pattern(type(rule).regex)}.match(v) is not None"
+
+
+def emit_option(rule, emitter: Emitter) -> str:
+    options = emitter.constant(
+        "L", f"({', '.join(literal(o) for o in rule.value)},)")
+    try:
+        frozenset(rule.value)
+    except TypeError:
+        return f"v in {options}"
+    members = emitter.constant("O", f"frozenset({options})")
+    # str is by far the common case and always hashable
+    return f"(v in {members} if type(v) is str else v in {options})"
+
+
+def emit_constant(rule, emitter: Emitter) -> str:
+    return f"str(v) == {str(rule.value)!r}"
+
+
+def emit_is_int(rule, emitter: Emitter) -> str:
+    t = emitter.typed
+    return f"not isinstance({t}, bool) and isinstance({t}, int) == {rule.value}"
+
+
+def emit_is_str(rule, emitter: Emitter) -> str:
+    return f"isinstance(v, str) == {rule.value}"
+
+
+def emit_is_float(rule, emitter: Emitter) -> str:
+    return f"isinstance({emitter.typed}, float) == {rule.value}"
+
+
+def emit_is_number(rule, emitter: Emitter) -> str:
+    t = emitter.typed
+    return (
+        f"(isinstance({t}, float) == {rule.value} or "
+        f"(not isinstance({t}, bool) and isinstance({t}, int) == {rule.value}))"
+    )
+
+
+def emit_is_greater_than_eq(rule, emitter: Emitter) -> str:
+    t = emitter.typed
+    return (
+        f"(isinstance({t}, float) or (not isinstance({t}, bool) and isinstance({t}, int))) "
+        f"and {t} >= {literal(rule.value)}"
+    )
+
+
+def emit_is_lower_than_eq(rule, emitter: Emitter) -> str:
+    t = emitter.typed
+    return (
+        f"(isinstance({t}, float) or (not isinstance({t}, bool) and isinstance({t}, int))) "
+        f"and {t} <= {literal(rule.value)}"
+    )
+
+
+EMITTERS: dict[type, Callable[[Any, Emitter], str]] = {
+    all_descriptions.Length: emit_length,
+    all_descriptions.MinLength: emit_min_length,
+    all_descriptions.MaxLength: emit_max_length,
+    all_descriptions.Regex: emit_regex,
+    all_descriptions.Option: emit_option,
+    all_descriptions.Constant: emit_constant,
+    all_descriptions.IsInt: emit_is_int,
+    all_descriptions.IsStr: emit_is_str,
+    all_descriptions.IsFloat: emit_is_float,
+    all_descriptions.IsNumber: emit_is_number,
+    all_descriptions.IsGreaterThanEq: emit_is_greater_than_eq,
+    all_descriptions.IsLowerThanEq: emit_is_lower_than_eq,
+    all_descriptions.IsHttp: emit_pattern_match,
+    all_descriptions.IsHttps: emit_pattern_match,
+    all_descriptions.IsIpv4: emit_pattern_match,
+    all_descriptions.IsIpv6: emit_pattern_match,
+    all_descriptions.IsEmail: emit_pattern_match,
+    all_descriptions.IsUuid: emit_pattern_match,
+}
+
+
+def generate_python(
+    schema: CompiledDescription, source: str = "", coerce: bool = False
+) -> str:
+    """Source of a dependency-free module whose validate(env) returns what
+    is_valid_env would, with every rule inlined as a straight-line check."""
+    emitter = Emitter(coerce)
+    body: list[str] = []
+    for key in schema.keys:
+        checks = []
+        for name, rule in key.rules:
+            emit = EMITTERS.get(type(rule))
+            if emit == None:
+                raise ValueError(
+                    f"{type(rule).__name__} on {key.name} can't be compiled to python"
+                )
+            checks.append((name, f"({emit(rule, emitter)})"))
+        body.append(f"    v = get({key.name!r})")
+        if key.required:
+            body += [
+                "    if v is None:",
+                f"        raise RequiredVariableNotSet({f'{key.name} is_required not but set'!r})",
+            ]
+        typed = coerce and any(rule.typed for _, rule in key.rules)
+        if typed and key.required:
+            body.append("    t = coerce(v)")
+        elif typed:
+            body.append("    t = coerce(v) if v is not None else None")
+        body.append(
+            "    if not (" if key.required else "    if v is not None and not (")
+        body += [
+            f"        {check}{' and' if index < len(checks) - 1 else ''}"
+            for index, (_, check) in enumerate(checks)
+        ]
+        body += ["    ):", "        fails = []"]
+        for name, check in checks:
+            body += [f"        if not {check}:",
+                     f"            fails.append({name!r})"]
+        body.append(f"        invalid_vars.append([{key.name!r}, fails])")
+
+    lines = [
+        f"# generated by env_should_be {__version__}{f' from {source}' if source else ''}, do not edit",
+        "import re",
+        "",
+        "",
+        "class RequiredVariableNotSet(Exception):",
+        "    pass",
+        "",
+        "",
+        *emitter.constants,
+        *(["", "", COERCE_SOURCE] if coerce else []),
+        "",
+        "",
+        "def validate(env):",
+        "    get = env.get",
+        "    invalid_vars = []",
+        *body,
+        "    invalid_vars.sort(key=lambda fail: fail[0])",
+        "    return invalid_vars if invalid_vars else True",
+        "",
+    ]
+    return "\n".join(lines)
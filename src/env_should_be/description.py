@@ -22,48 +22,112 @@ __all__ = (
     "IsUuid",
 )
 
+import operator
 import re
 from abc import ABC
 from abc import abstractmethod
-from typing import Any, List, Optional
+from functools import cache
+from typing import Any
 from .exception import ValueUnassignableToDescription
 
+# below this many values numpy's conversion costs more than it saves
+VECTORIZE_FROM = 256
+
+
+@cache
+def get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def compare_lengths(lengths: list[int], compare, value: int) -> list[bool]:
+    "lengths holds -1 for values that have none, those never pass."
+    numpy = get_numpy() if len(lengths) >= VECTORIZE_FROM else None
+    if numpy != None:
+        array = numpy.fromiter(lengths, dtype=numpy.int64, count=len(lengths))
+        return (compare(array, value) & (array >= 0)).tolist()
+    return [length >= 0 and compare(length, value) for length in lengths]
+
+
+def is_number(actual: Any) -> bool:
+    return isinstance(actual, float) or (
+        isinstance(actual, int) and not isinstance(actual, bool)
+    )
+
 
 class Description(ABC):
+    # rules are immutable once built, so identical ones can be shared
+    # between keys and descriptions (see utils.intern_rule), which only
+    # holds them weakly
+    __slots__ = ("value", "__weakref__")
+    # checks the coerced (int/float/bool) form of the value when coercion is on
+    typed = False
+
     def __init__(self, value):
-        self.value = value
+        if not self.is_valid(value):
+            raise ValueUnassignableToDescription(
+                f"Value {value} is Invalid, can't be assigned to {self.__class__.__name__} "
+            )
+        self.restore(value)
+
+    @classmethod
+    def trusted(cls, value) -> Description:
+        "Builds a rule from an already validated value, e.g. when unpickling."
+        rule = cls.__new__(cls)
+        rule.restore(value)
+        return rule
+
+    def restore(self, value) -> None:
+        object.__setattr__(self, "value", value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f"{self.__class__.__name__} is immutable, it may be shared")
+
+    def __reduce__(self):
+        return (type(self).trusted, (self.value,))
 
     @abstractmethod
     def is_valid(self, value) -> bool:
         pass
 
-    @property
-    def value(self):
-        return self.__value
-
-    @value.setter
-    def value(self, val):
-        if self.is_valid(val):
-            self.__value = val
-            return
-        raise ValueUnassignableToDescription(
-            f"Value {val} is Invalid, can't be assigned to {self.__class__.__name__} "
-        )
-
     @abstractmethod
     def does_pass(self, actual: Any | None) -> bool:
         pass
 
+    def does_pass_many(self, actuals: list[Any]) -> list[bool]:
+        return [self.does_pass(actual) for actual in actuals]
+
 
 class Boolean(Description):
+    __slots__ = ()
+
     def is_valid(self, value):
         return not None and isinstance(value, bool)
 
 
 class Length(Description):
+    __slots__ = ()
+
+    compare = staticmethod(operator.eq)
+
     def is_valid(self, value):
         return isinstance(value, int) and value > 0
 
+    def lengths_of(self, actuals: list[Any]) -> list[int]:
+        return [
+            len(actual)
+            if actual is not None and hasattr(actual, "__len__")
+            else -1
+            for actual in actuals
+        ]
+
+    def does_pass_many(self, actuals: list[Any]) -> list[bool]:
+        return compare_lengths(self.lengths_of(actuals), self.compare, self.value)
+
     def does_pass(self, actual: Any | None) -> bool:
         return (
             actual is not None
@@ -73,6 +137,13 @@ class Length(Description):
 
 
 class MinLength(Length):
+    __slots__ = ()
+
+    compare = staticmethod(operator.ge)
+
+    def lengths_of(self, actuals: list[Any]) -> list[int]:
+        return [len(actual) if isinstance(actual, str) else -1 for actual in actuals]
+
     def does_pass(self, actual: Any | None) -> bool:
         return (
             isinstance(actual, str)
@@ -82,6 +153,13 @@ class MinLength(Length):
 
 
 class MaxLength(Length):
+    __slots__ = ()
+
+    compare = staticmethod(operator.le)
+
+    def lengths_of(self, actuals: list[Any]) -> list[int]:
+        return [len(actual) if isinstance(actual, str) else -1 for actual in actuals]
+
     def does_pass(self, actual: Any | None) -> bool:
         return (
             isinstance(actual, str)
@@ -91,6 +169,20 @@ class MaxLength(Length):
 
 
 class Regex(Description):
+    __slots__ = ("compiled",)
+
+    def restore(self, value) -> None:
+        super().restore(value)
+        object.__setattr__(self, "compiled", None)
+
+    @property
+    def pattern(self) -> re.Pattern:
+        # compiled on first use: rules loaded from .esb or the schema cache
+        # skip is_valid, and a key's regexes may only run combined
+        if self.compiled == None:
+            object.__setattr__(self, "compiled", re.compile(self.value))
+        return self.compiled
+
     def is_valid(self, value):
         try:
             re.compile(value)
@@ -99,22 +191,26 @@ class Regex(Description):
             return False
 
     def does_pass(self, actual: Any | None) -> bool:
-        return (
-            actual != None
-            and isinstance(actual, str)
-            and (re.match(self.value, actual) != None)
-        )
+        return isinstance(actual, str) and self.pattern.match(actual) != None
+
+    def does_pass_many(self, actuals: list[Any]) -> list[bool]:
+        match = self.pattern.match
+        return [isinstance(actual, str) and match(actual) != None for actual in actuals]
 
 
 class Option(Description):
+    __slots__ = ()
+
     def is_valid(self, value: list[Any]):
-        return isinstance(value, List) and hasattr(value, "__iter__") and len(value) > 0
+        return isinstance(value, list) and hasattr(value, "__iter__") and len(value) > 0
 
     def does_pass(self, actual: Any | None) -> bool:
         return actual in self.value
 
 
 class Constant(Description):
+    __slots__ = ()
+
     def is_valid(self, value):
         try:
             x = str(value)
@@ -127,28 +223,44 @@ class Constant(Description):
 
 
 class IsInt(Boolean):
+    __slots__ = ()
+    typed = True
+
     def does_pass(self, actual):
         return not isinstance(actual, bool) and isinstance(actual, int) == self.value
 
 
 class IsStr(Boolean):
+    __slots__ = ()
+
     def does_pass(self, actual):
         return isinstance(actual, str) == self.value
 
 
 class IsFloat(Boolean):
+    __slots__ = ()
+    typed = True
+
     def does_pass(self, actual):
         return isinstance(actual, float) == self.value
 
 
 class IsNumber(Boolean):
+    __slots__ = ()
+    typed = True
+
     def does_pass(self, actual):
-        case1 = IsFloat(self.value)
-        case2 = IsInt(self.value)
-        return case1.does_pass(actual) or case2.does_pass(actual)
+        # IsFloat(value) or IsInt(value), without building either
+        return isinstance(actual, float) == self.value or (
+            not isinstance(actual, bool)
+            and isinstance(actual, int) == self.value
+        )
 
 
 class IsGreaterThanEq(Description):
+    __slots__ = ()
+    typed = True
+
     def is_valid(self, value):
         return (
             not None
@@ -157,58 +269,80 @@ class IsGreaterThanEq(Description):
         )
 
     def does_pass(self, actual):
-        case1 = IsNumber(True)
-        return case1.does_pass(actual) and (actual >= self.value)
+        return is_number(actual) and (actual >= self.value)
 
 
 class IsLowerThanEq(IsGreaterThanEq):
+    __slots__ = ()
+
     def does_pass(self, actual):
-        case1 = IsNumber(True)
-        return case1.does_pass(actual) and (actual <= self.value)
+        return is_number(actual) and (actual <= self.value)
 
 
-class IsHttp(Boolean):
-    def does_pass(self, actual):
-        i = Regex(
-            "^https?:\\/\\/(?:www\\.)?[-a-zA-Z0-9@:%._\\+~#=]{1,256}\\.[a-zA-Z0-9()]{1,6}\\b(?:[-a-zA-Z0-9()@:%_\\+.~#?&\\/=]*)$"
-        )
-        return i.does_pass(actual)
+class CompiledOnFirstUse:
+    "Compiles owner.regex on first access and caches it on the owner class."
 
+    def __set_name__(self, owner, name):
+        self.name = name
 
-class IsHttps(Boolean):
-    def does_pass(self, actual):
-        i = Regex(
-            "^https:\\/\\/(?:www\\.)?[-a-zA-Z0-9@:%._\\+~#=]{1,256}\\.[a-zA-Z0-9()]{1,6}\\b(?:[-a-zA-Z0-9()@:%_\\+.~#?&\\/=]*)$"
-        )
-        return i.does_pass(actual)
+    def __get__(self, instance, owner):
+        pattern = re.compile(owner.regex)
+        setattr(owner, self.name, pattern)
+        return pattern
 
 
-class IsIpv4(Boolean):
-    def does_pass(self, actual):
-        i = Regex(
-            "^(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"
-        )
-        return i.does_pass(actual)
+class PatternMatch(Boolean):
+    __slots__ = ()
 
+    regex: str
+    pattern: re.Pattern = CompiledOnFirstUse()
 
-class IsIpv6(Boolean):
     def does_pass(self, actual):
-        i = Regex(
-            "^(([0-9a-fA-F]{1,4}:){7,7}[0-9a-fA-F]{1,4}|([0-9a-fA-F]{1,4}:){1,7}:|([0-9a-fA-F]{1,4}:){1,6}:[0-9a-fA-F]{1,4}|([0-9a-fA-F]{1,4}:){1,5}(:[0-9a-fA-F]{1,4}){1,2}|([0-9a-fA-F]{1,4}:){1,4}(:[0-9a-fA-F]{1,4}){1,3}|([0-9a-fA-F]{1,4}:){1,3}(:[0-9a-fA-F]{1,4}){1,4}|([0-9a-fA-F]{1,4}:){1,2}(:[0-9a-fA-F]{1,4}){1,5}|[0-9a-fA-F]{1,4}:((:[0-9a-fA-F]{1,4}){1,6})|:((:[0-9a-fA-F]{1,4}){1,7}|:)|fe80:(:[0-9a-fA-F]{0,4}){0,4}%[0-9a-zA-Z]{1,}|::(ffff(:0{1,4}){0,1}:){0,1}((25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9])\\.){3,3}(25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9])|([0-9a-fA-F]{1,4}:){1,4}:((25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9])\\.){3,3}(25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9]))$"
-        )
-        return i.does_pass(actual)
+        return isinstance(actual, str) and self.pattern.match(actual) != None
 
+    def does_pass_many(self, actuals):
+        match = self.pattern.match
+        return [isinstance(actual, str) and match(actual) != None for actual in actuals]
 
-class IsEmail(Boolean):
-    def does_pass(self, actual):
-        i = Regex(
-            r"([A-Za-z0-9]+[.-_])*[A-Za-z0-9]+@[A-Za-z0-9-]+(\.[A-Z|a-z]{2,})+")
-        return i.does_pass(actual)
 
+class IsHttp(PatternMatch):
+    __slots__ = ()
+
+    regex = "^https?:\\/\\/(?:www\\.)?[-a-zA-Z0-9@:%._\\+~#=]{1,256}\\.[a-zA-Z0-9()]{1,6}\\b(?:[-a-zA-Z0-9()@:%_\\+.~#?&\\/=]*)$"
+
+
+class IsHttps(PatternMatch):
+    __slots__ = ()
+
+    regex = "^https:\\/\\/(?:www\\.)?[-a-zA-Z0-9@:%._\\+~#=]{1,256}\\.[a-zA-Z0-9()]{1,6}\\b(?:[-a-zA-Z0-9()@:%_\\+.~#?&\\/=]*)$"
+
+
+class IsIpv4(PatternMatch):
+    __slots__ = ()
+
+    regex = "^(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"
+
+
+class IsIpv6(PatternMatch):
+    __slots__ = ()
+
+    regex = "^(([0-9a-fA-F]{1,4}:){7,7}[0-9a-fA-F]{1,4}|([0-9a-fA-F]{1,4}:){1,7}:|([0-9a-fA-F]{1,4}:){1,6}:[0-9a-fA-F]{1,4}|([0-9a-fA-F]{1,4}:){1,5}(:[0-9a-fA-F]{1,4}){1,2}|([0-9a-fA-F]{1,4}:){1,4}(:[0-9a-fA-F]{1,4}){1,3}|([0-9a-fA-F]{1,4}:){1,3}(:[0-9a-fA-F]{1,4}){1,4}|([0-9a-fA-F]{1,4}:){1,2}(:[0-9a-fA-F]{1,4}){1,5}|[0-9a-fA-F]{1,4}:((:[0-9a-fA-F]{1,4}){1,6})|:((:[0-9a-fA-F]{1,4}){1,7}|:)|fe80:(:[0-9a-fA-F]{0,4}){0,4}%[0-9a-zA-Z]{1,}|::(ffff(:0{1,4}){0,1}:){0,1}((25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9])\\.){3,3}(25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9])|([0-9a-fA-F]{1,4}:){1,4}:((25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9])\\.){3,3}(25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9]))$"
 
-class IsUuid(Boolean):
     def does_pass(self, actual):
-        i = Regex(
-            "^[0-9a-f]{8}-[0-9a-f]{4}-[0-5][0-9a-f]{3}-[089ab][0-9a-f]{3}-[0-9a-f]{12}$"
-        )
-        return i.does_pass(actual)
+        # skip the (large) alternation for anything that can't be an ipv6
+        return isinstance(actual, str) and ":" in actual and super().does_pass(actual)
+
+
+class IsEmail(PatternMatch):
+    __slots__ = ()
+
+    # same language as ([A-Za-z0-9]+[.-_])*[A-Za-z0-9]+@..., where [.-_] spans
+    # ./0-9:;<=>?@A-Z[\]^_, without the nested quantifiers that made it
+    # backtrack exponentially on long runs of letters or digits
+    regex = r"[A-Za-z0-9](?:[A-Za-z0-9]|[./:;<=>?@\[\\\]^_][A-Za-z0-9])*@[A-Za-z0-9-]+(\.[A-Z|a-z]{2,})+"
+
+
+class IsUuid(PatternMatch):
+    __slots__ = ()
+
+    regex = "^[0-9a-f]{8}-[0-9a-f]{4}-[0-5][0-9a-f]{3}-[089ab][0-9a-f]{3}-[0-9a-f]{12}$"
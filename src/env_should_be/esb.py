@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import marshal
+from time import perf_counter
+
+from .exception import DescriptionFileNotLoading
+from .exception import StaleCompiledDescription
+from .utils import CompiledDescription
+from .utils import CompiledKey
+from .utils import emit_timing
+from .utils import file_timing_hooks
+from .utils import intern_rule
+from .utils import RULES
+from .utils import Timing
+from .utils import timing_hooks
+
+# an .esb file is MAGIC, ESB_FORMAT as 2 little endian bytes, then the
+# marshalled rule table: ((key, required, ((rule name, value), ...)), ...)
+MAGIC = b"ESB\0"
+# bump whenever the payload layout or the meaning of a rule changes
+ESB_FORMAT = 1
+HEADER_SIZE = len(MAGIC) + 2
+
+
+def schema_to_table(schema: CompiledDescription) -> tuple:
+    return tuple(
+        (key.name, key.required,
+         tuple((name, rule.value) for name, rule in key.rules))
+        for key in schema.keys
+    )
+
+
+def table_to_schema(table: tuple) -> CompiledDescription:
+    "Rules are built trusted: their values were validated when the table was made."
+    return CompiledDescription(keys=tuple(
+        CompiledKey(
+            name=name,
+            required=required,
+            rules=tuple((rule, intern_rule(RULES[rule], value, trusted=True))
+                        for rule, value in rules),
+        )
+        for name, required, rules in table
+    ))
+
+
+def schema_to_description(schema: CompiledDescription) -> dict:
+    "A description that compiles back to schema, for code that diffs descriptions."
+    return {
+        key.name: {
+            **{name: rule.value for name, rule in key.rules},
+            "required": key.required,
+        }
+        for key in schema.keys
+    }
+
+
+def dump_esb(schema: CompiledDescription) -> bytes:
+    try:
+        payload = marshal.dumps(schema_to_table(schema))
+    except ValueError as exc:
+        # e.g. a yaml date given to constant
+        raise ValueError(
+            f"a rule value can't be stored in an .esb file, {exc}")
+    return MAGIC + ESB_FORMAT.to_bytes(2, "little") + payload
+
+
+def parse_esb(path: str, content: bytes) -> CompiledDescription:
+    if content[:len(MAGIC)] != MAGIC or len(content) < HEADER_SIZE:
+        raise DescriptionFileNotLoading(
+            f"couldn't load file at:{path}, not an .esb file")
+    version = int.from_bytes(content[len(MAGIC):HEADER_SIZE], "little")
+    if version != ESB_FORMAT:
+        raise StaleCompiledDescription(
+            f"couldn't load file at:{path}, compiled with format {version} but "
+            f"this version reads format {ESB_FORMAT}, compile it again")
+    try:
+        return table_to_schema(marshal.loads(content[HEADER_SIZE:]))
+    except (EOFError, ValueError, TypeError, KeyError) as exc:
+        # truncated, or a rule this version doesn't know
+        raise DescriptionFileNotLoading(
+            f"couldn't load file at:{path}, corrupt .esb file, {exc!r}")
+
+
+def load_esb(path: str) -> CompiledDescription:
+    start = perf_counter() if timing_hooks or file_timing_hooks else None
+    try:
+        with open(path, "rb") as file:
+            content = file.read()
+    except OSError as exc:
+        raise DescriptionFileNotLoading(f"couldn't load file at:{path}, {exc}")
+    schema = parse_esb(path, content)
+    if start != None:
+        emit_timing(Timing("load", perf_counter() - start, path=path))
+    return schema
+
+
+def write_esb(path: str, schema: CompiledDescription) -> None:
+    content = dump_esb(schema)
+    with open(path, "wb") as file:
+        file.write(content)
@@ -12,6 +12,16 @@ class DescriptionFileNotLoading(Exception):
     pass
 
 
+class DescriptionInheritanceCycle(DescriptionFileNotLoading):
+    'Raised when descriptions extend each other in a loop'
+    pass
+
+
+class StaleCompiledDescription(DescriptionFileNotLoading):
+    'Raised when an .esb file was compiled by a version with another format'
+    pass
+
+
 class FileHasNoExtension(Exception):
     pass
 
@@ -26,3 +36,21 @@ class RequiredVariableNotSet(Exception):
 
 class CallBackNotRunning(Exception):
     pass
+
+
+class RegexTimeout(Exception):
+    'Raised when a regex runs longer than its time budget'
+    pass
+
+
+class UnsafeRegexWarning(UserWarning):
+    'Warned about when a description uses a regex prone to catastrophic backtracking'
+    pass
+
+
+class EnvironmentNotMatching(Exception):
+    'Raised by ensure() when the environment fails its description(s)'
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import glob
+import os
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Iterator
+
+from .exception import RequiredVariableNotSet
+from .patterns import get_regex_worker
+from .utils import build_rule_index
+from .utils import collect_errors
+from .utils import load_env_file
+from .utils import load_schema
+from .utils import RuleIndex
+from .utils import VariableError
+
+# upper bound of env files per task, small fleets are spread thinner
+FLEET_CHUNK_SIZE = 32
+
+
+@dataclass
+class FileResult:
+    path: str
+    errors: list[VariableError] = field(default_factory=list)
+    problem: str | None = None  # unreadable env file, missing required variable
+
+    @property
+    def ok(self) -> bool:
+        return self.problem == None and len(self.errors) == 0
+
+
+@dataclass
+class FleetValidator:
+    "The compiled descriptions, sent once to each worker process."
+
+    descriptions: list[str]
+    index: RuleIndex
+    coerce: bool = False
+    regex_timeout: float | None = None
+
+    def validate(self, path: str) -> FileResult:
+        try:
+            env = load_env_file(path)
+        except (OSError, ValueError) as exc:
+            # unreadable (permissions, a directory...), the rest of the fleet goes on
+            return FileResult(path, problem=f"couldn't load file at:{path}, {exc}")
+        try:
+            results = self.index.attribute(
+                env,
+                self.index.outcomes(
+                    env, coerce=self.coerce, regex_timeout=self.regex_timeout),
+            )
+        except RequiredVariableNotSet as exc:
+            return FileResult(path, problem=str(exc))
+        return FileResult(path, errors=collect_errors(self.descriptions, results))
+
+
+# set in each worker by init_worker
+worker_validator: FleetValidator | None = None
+
+
+def init_worker(validator: FleetValidator) -> None:
+    global worker_validator
+    worker_validator = validator
+    # a forked worker must not share the parent's regex worker pipe
+    get_regex_worker.cache_clear()
+
+
+def validate_chunk(paths: list[str]) -> list[FileResult]:
+    return [worker_validator.validate(path) for path in paths]
+
+
+def find_env_files(root: str, pattern: str = "**/.env") -> list[str]:
+    return sorted(
+        os.path.join(root, path)
+        for path in glob.glob(pattern, root_dir=root, recursive=True)
+        if os.path.isfile(os.path.join(root, path))
+    )
+
+
+def compile_fleet_validator(
+    descriptions: list[str],
+    cache_dir: str | None = None,
+    coerce: bool = False,
+    regex_timeout: float | None = None,
+) -> FleetValidator:
+    index = build_rule_index(
+        [load_schema(path, cache_dir) for path in descriptions],
+        combine_regexes=regex_timeout == None,
+    )
+    return FleetValidator(list(descriptions), index, coerce, regex_timeout)
+
+
+def chunked(paths: list[str], jobs: int) -> list[list[str]]:
+    # a few chunks per worker so that slow files don't leave others idle
+    size = max(1, min(FLEET_CHUNK_SIZE, -(-len(paths) // (jobs * 4))))
+    return [paths[start: start + size] for start in range(0, len(paths), size)]
+
+
+def validate_fleet(
+    paths: list[str], validator: FleetValidator, jobs: int = 1
+) -> Iterator[FileResult]:
+    "Yields results as workers complete them, not in path order."
+    if jobs <= 1:
+        for path in paths:
+            yield validator.validate(path)
+        return
+    from concurrent.futures import as_completed
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker, initargs=(validator,)
+    ) as executor:
+        futures = [executor.submit(validate_chunk, chunk)
+                   for chunk in chunked(paths, jobs)]
+        for future in as_completed(futures):
+            yield from future.result()
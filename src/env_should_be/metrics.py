@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import time
+
+from .stats import Stats
+from .utils import VariableError
+
+PREFIX = "env_should_be"
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels_of(**labels: str) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        f'{name}="{escape_label(str(value))}"' for name, value in labels.items()) + "}"
+
+
+class Metrics:
+    "Gauges in the prometheus text exposition format, grouped by name."
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.declared: set[str] = set()
+
+    def gauge(self, name: str, help: str, value: float, **labels: str) -> None:
+        name = f"{PREFIX}_{name}"
+        if name not in self.declared:
+            self.declared.add(name)
+            self.lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+        self.lines.append(f"{name}{labels_of(**labels)} {value!r}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(
+    descriptions: list[str],
+    errors: list[VariableError],
+    stats: Stats,
+    duration: float,
+    cached: bool = False,
+) -> str:
+    """Outcome and cost of one validation, stats must have been a timing
+    hook while it ran; cached when a schema cache directory was used."""
+    metrics = Metrics()
+    metrics.gauge("last_run_timestamp_seconds",
+                  "When the environment was last validated.", time.time())
+    metrics.gauge("validation_duration_seconds",
+                  "Time spent loading the env and description(s) and validating them.", duration)
+    metrics.gauge("env_matching", "1 when every description matched, 0 otherwise.",
+                  int(len(errors) == 0))
+    for path in dict.fromkeys(descriptions):
+        metrics.gauge("description_parse_duration_seconds",
+                      "Time spent loading and compiling a description, or reading it from the cache.",
+                      sum(stats.files.get(path, {}).values()), description=path)
+    failing = {path: [] for path in descriptions}
+    for e in errors:
+        failing.setdefault(e.description_path, []).extend(e.errors)
+    for path, variables in failing.items():
+        metrics.gauge("failing_keys", "Keys of a description the environment doesn't match.",
+                      len(variables), description=path)
+    for path, variables in failing.items():
+        rules: dict[str, int] = {}
+        for _, fails in variables:
+            for name in fails:
+                # "regex:timeout" counts as a failing regex
+                rule = name.partition(":")[0]
+                rules[rule] = rules.get(rule, 0) + 1
+        for rule, count in sorted(rules.items()):
+            metrics.gauge("failing_rules", "Keys failing a rule type, per description.",
+                          count, description=path, rule=rule)
+    if cached:
+        hits = sum("cache" in stats.files.get(path, {})
+                   for path in descriptions)
+        metrics.gauge("schema_cache_hits",
+                      "Descriptions read from the schema cache.", hits)
+        metrics.gauge("schema_cache_lookups", "Descriptions looked up in the schema cache.",
+                      len(descriptions))
+        metrics.gauge("schema_cache_hit_ratio", "schema_cache_hits / schema_cache_lookups.",
+                      hits / len(descriptions) if descriptions else 0.0)
+    return metrics.render()
+
+
+def write_metrics(path: str, text: str) -> None:
+    """Replaces path in one rename, so node_exporter's textfile collector
+    never reads a half written file."""
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    # same directory for an atomic rename, not *.prom so it's never collected
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+        # mkstemp creates 0600 files, the collector may run as another user
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import re
+from functools import cache
+from re import _parser
+from typing import Any
+from typing import Iterator
+
+from . import description as all_descriptions
+from .exception import RegexTimeout
+
+# flags of a pattern without inline flags, anything else can't be nested
+DEFAULT_FLAGS = re.compile("").flags
+# outcome of a regex that ran over its budget, reported as "<rule>:timeout"
+TIMEOUT = "timeout"
+# sent by the worker process once it's ready to match
+READY = "ready"
+
+
+def regex_of(rule: all_descriptions.Description) -> str | None:
+    "The pattern a rule matches values against, None for non-regex rules."
+    if isinstance(rule, all_descriptions.Regex):
+        return rule.value
+    if isinstance(rule, all_descriptions.PatternMatch):
+        return type(rule).regex
+    return None
+
+
+def subpatterns(av) -> Iterator[_parser.SubPattern]:
+    "The subpatterns nested in an opcode's arguments."
+    stack = [av]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _parser.SubPattern):
+            yield item
+        elif isinstance(item, (tuple, list)):
+            stack.extend(item)
+
+
+def walk(parsed) -> Iterator[int]:
+    "Every opcode of a parsed pattern, nested subpatterns included."
+    for op, av in parsed:
+        yield op
+        for item in subpatterns(av):
+            yield from walk(item)
+
+
+def nests_unbounded(parsed, inside_unbounded: bool = False) -> bool:
+    for op, av in parsed:
+        if op in (_parser.MAX_REPEAT, _parser.MIN_REPEAT):
+            unbounded = av[1] == _parser.MAXREPEAT
+            if unbounded and inside_unbounded:
+                return True
+            if nests_unbounded(av[2], inside_unbounded or unbounded):
+                return True
+            continue
+        # possessive repeats and atomic groups are never backtracked into
+        atomic = op in (_parser.POSSESSIVE_REPEAT, _parser.ATOMIC_GROUP)
+        for item in subpatterns(av):
+            if nests_unbounded(item, inside_unbounded and not atomic):
+                return True
+    return False
+
+
+@cache
+def is_unsafe(pattern: str) -> bool:
+    """Whether the pattern repeats something that itself repeats without
+    bound, like (a+)* , which backtracks exponentially on a near miss."""
+    try:
+        return nests_unbounded(_parser.parse(pattern))
+    except (re.error, RecursionError):
+        return False
+
+
+def can_combine(pattern: str) -> bool:
+    try:
+        compiled = re.compile(pattern)
+        parsed = _parser.parse(pattern)
+    except re.error:
+        return False
+    if compiled.flags != DEFAULT_FLAGS or compiled.groupindex:
+        # global inline flags would leak to the other patterns, names may clash
+        return False
+    # group numbers shift once nested, so references would point elsewhere
+    return not any(
+        op in (_parser.GROUPREF, _parser.GROUPREF_EXISTS) for op in walk(parsed)
+    )
+
+
+class CombinedRegex:
+    """Several patterns matched in one pass: each one sits in an optional
+    lookahead followed by an empty marker group, the marker takes part in
+    the match exactly when re.match(pattern, value) would succeed."""
+
+    # a plain class, this module is on the cli's import path
+    __slots__ = ("pattern", "markers")
+
+    def __init__(self, pattern: re.Pattern, markers: tuple[int, ...]):
+        self.pattern = pattern
+        self.markers = markers  # index of each pattern's marker in match.groups()
+
+    def markers_of(self, value: Any) -> tuple[str | None, ...]:
+        "One entry per pattern, None for those that don't match."
+        if not isinstance(value, str):
+            return (None,) * len(self.markers)
+        groups = self.pattern.match(value).groups()
+        if len(groups) != len(self.markers):
+            # the patterns have groups of their own
+            return tuple(groups[marker] for marker in self.markers)
+        return groups
+
+    def outcomes(self, value: Any) -> list[bool]:
+        return [marker != None for marker in self.markers_of(value)]
+
+
+def combine_patterns(patterns: list[str]) -> CombinedRegex | None:
+    "None when any of the patterns has to be matched on its own."
+    if not all(can_combine(pattern) for pattern in patterns):
+        return None
+    source = "".join(
+        f"(?=(?:{pattern})(?P<_m{index}>)|)" for index, pattern in enumerate(patterns)
+    )
+    try:
+        compiled = re.compile(source)
+    except (re.error, RecursionError, OverflowError):
+        return None
+    return CombinedRegex(
+        pattern=compiled,
+        markers=tuple(compiled.groupindex[f"_m{index}"] - 1
+                      for index in range(len(patterns))),
+    )
+
+
+def serve(connection) -> None:
+    "Loop of the worker process: (pattern, value) in, matched or not out."
+    compiled: dict[str, re.Pattern] = {}
+    connection.send(READY)
+    while True:
+        try:
+            pattern, value = connection.recv()
+        except EOFError:
+            return
+        if pattern not in compiled:
+            compiled[pattern] = re.compile(pattern)
+        connection.send(compiled[pattern].match(value) != None)
+
+
+class RegexWorker:
+    """Matches in a separate process, python can't interrupt a running
+    re.match, so the only way to bound one is to kill whoever runs it."""
+
+    def __init__(self):
+        from threading import Lock
+
+        self.lock = Lock()
+        self.process = None
+        self.connection = None
+
+    def start(self) -> None:
+        import multiprocessing
+
+        # spawn rather than fork: --jobs may have threads running
+        context = multiprocessing.get_context("spawn")
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        # a spawned interpreter takes a while to come up, that must not
+        # count against the budget of the first match it runs
+        if self.connection.recv() != READY:
+            raise RuntimeError("the regex worker failed to start")
+
+    def stop(self) -> None:
+        if self.process != None:
+            self.process.kill()
+            self.process.join()
+            self.connection.close()
+            self.process = self.connection = None
+
+    def match(self, pattern: str, value: str, timeout: float) -> bool:
+        with self.lock:
+            if self.process == None:
+                # also after a timeout, before (not within) the next budget
+                self.start()
+            self.connection.send((pattern, value))
+            if not self.connection.poll(timeout):
+                self.stop()
+                raise RegexTimeout(
+                    f"{pattern!r} took more than {timeout}s on a {len(value)} characters value"
+                )
+            return self.connection.recv()
+
+
+@cache
+def get_regex_worker() -> RegexWorker:
+    return RegexWorker()
+
+
+def does_pass_within(
+    rule: all_descriptions.Description, actual: Any, timeout: float
+) -> bool | str:
+    "rule.does_pass, or TIMEOUT when a user regex runs over its budget."
+    if not isinstance(rule, all_descriptions.Regex) or not isinstance(actual, str):
+        return rule.does_pass(actual)
+    try:
+        return get_regex_worker().match(rule.value, actual, timeout)
+    except RegexTimeout:
+        return TIMEOUT
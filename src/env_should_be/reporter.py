@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import sys
+from abc import ABC
+from abc import abstractmethod
+from typing import TextIO
+
+from .utils import VariableError
+
+# reports are written in blocks of this size rather than line by line
+REPORT_BUFFER_SIZE = 1 << 16
+
+
+def error_as_dict(error: VariableError) -> dict:
+    return {
+        "description_path": error.description_path,
+        "variables": [{"key": key, "rules": fails} for key, fails in error.errors],
+    }
+
+
+def open_output(path: str | None, fallback: TextIO) -> TextIO:
+    "A block buffered writer on path, or on fallback's file descriptor."
+    if path != None:
+        return open(path, "w", buffering=REPORT_BUFFER_SIZE, encoding="utf-8")
+    try:
+        fd = fallback.fileno()
+    except (AttributeError, OSError, ValueError):
+        # e.g. a replaced sys.stdout without a descriptor
+        return fallback
+    fallback.flush()
+    return open(fd, "w", buffering=REPORT_BUFFER_SIZE,
+                encoding=fallback.encoding, closefd=False)
+
+
+class Reporter(ABC):
+    "Writes results as they are produced, one env at a time."
+
+    def __init__(self, stream: TextIO, descriptions: list[str] = ()):
+        self.stream = stream
+        self.descriptions = list(descriptions)
+        self.total = 0
+        self.failing = 0
+
+    def start(self) -> None:
+        pass
+
+    def report(
+        self, env: str | None, errors: list[VariableError], problem: str | None = None
+    ) -> None:
+        self.total += 1
+        if problem != None or len(errors) > 0:
+            self.failing += 1
+        self.write(env, errors, problem)
+
+    @abstractmethod
+    def write(self, env: str | None, errors: list[VariableError], problem: str | None) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.finish()
+        if self.stream in (sys.stdout, sys.stderr):
+            self.stream.flush()
+        else:
+            self.stream.close()
+
+
+class TextReporter(Reporter):
+    """The log lines the cli always printed, for fleets prefixed by each env
+    file's path and followed by a count of the failing ones."""
+
+    def __init__(
+        self,
+        stream: TextIO,
+        descriptions: list[str] = (),
+        verbose: bool = False,
+        fleet: bool = False,
+    ):
+        super().__init__(stream, descriptions)
+        self.verbose = verbose
+        self.fleet = fleet
+
+    def write(self, env, errors, problem):
+        write = self.stream.write
+        prefix = f"{env}: " if self.fleet else ""
+        if problem != None:
+            write(f"ERROR: {prefix}{problem}\n")
+        elif len(errors) == 0 and self.verbose:
+            write(f"DEBUG: {prefix}matching\n")
+        for e in errors:
+            write(f"WARNING: {prefix}Env Not matching {e.description_path}\n")
+            for variable, fails in e.errors:
+                write(f"ERROR: \n {variable}, failing to match {fails}\n")
+
+    def finish(self):
+        if self.fleet:
+            self.stream.write(
+                f"INFO: {self.failing} of {self.total} env files not matching\n")
+
+
+class JsonReporter(Reporter):
+    "One json document, its results array written an element at a time."
+
+    def start(self):
+        import json
+
+        self.dumps = json.dumps
+        self.stream.write('{"results": [')
+
+    def write(self, env, errors, problem):
+        separator = ",\n" if self.total > 1 else "\n"
+        self.stream.write(separator + self.dumps({
+            "env": env,
+            "ok": problem == None and len(errors) == 0,
+            "problem": problem,
+            "errors": [error_as_dict(e) for e in errors],
+        }))
+
+    def finish(self):
+        self.stream.write(
+            f'\n], "total": {self.total}, "failing": {self.failing}}}\n')
+
+
+class JsonLinesReporter(Reporter):
+    "A json object per failing key (or unreadable env), nothing for passing ones."
+
+    def start(self):
+        import json
+
+        self.dumps = json.dumps
+
+    def write(self, env, errors, problem):
+        write, dumps = self.stream.write, self.dumps
+        if problem != None:
+            write(dumps({"env": env, "problem": problem}) + "\n")
+        for e in errors:
+            for key, fails in e.errors:
+                write(dumps({
+                    "env": env,
+                    "description_path": e.description_path,
+                    "key": key,
+                    "rules": fails,
+                }) + "\n")
+
+
+class JunitReporter(Reporter):
+    "A testsuite per env and a testcase per description, as CI servers read them."
+
+    def start(self):
+        from xml.sax.saxutils import quoteattr
+
+        self.quoteattr = quoteattr
+        self.stream.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n')
+
+    def write(self, env, errors, problem):
+        quote = self.quoteattr
+        name = quote(env if env != None else "environment")
+        write = self.stream.write
+        if problem != None:
+            write(f'  <testsuite name={name} tests="1" failures="0" errors="1">\n'
+                  f'    <testcase classname={name} name="load">'
+                  f'<error message={quote(problem)}/></testcase>\n  </testsuite>\n')
+            return
+        failing = {e.description_path: e for e in errors}
+        descriptions = self.descriptions + [
+            path for path in failing if path not in self.descriptions]
+        write(f'  <testsuite name={name} tests="{len(descriptions)}" '
+              f'failures="{len(failing)}" errors="0">\n')
+        for path in descriptions:
+            case = f"    <testcase classname={name} name={quote(str(path))}"
+            if path not in failing:
+                write(case + "/>\n")
+                continue
+            failures = "; ".join(
+                f"{variable} failing to match {', '.join(fails)}"
+                for variable, fails in failing[path].errors
+            )
+            write(f"{case}><failure message={quote(failures)}/></testcase>\n")
+        write("  </testsuite>\n")
+
+    def finish(self):
+        self.stream.write("</testsuites>\n")
+
+
+REPORTERS = {
+    "text": TextReporter,
+    "json": JsonReporter,
+    "jsonl": JsonLinesReporter,
+    "junit": JunitReporter,
+}
+
+
+def get_reporter(
+    format: str,
+    output: str | None = None,
+    descriptions: list[str] = (),
+    verbose: bool = False,
+    fleet: bool = False,
+) -> Reporter:
+    "A started reporter, call close() once every result is reported."
+    if format == "text":
+        # the text report keeps going to stderr, like the logging it replaces
+        reporter = TextReporter(
+            open_output(output, sys.stderr), descriptions, verbose, fleet)
+    else:
+        reporter = REPORTERS[format](
+            open_output(output, sys.stdout), descriptions)
+    reporter.start()
+    return reporter
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import os
+
+from .exception import EnvironmentNotMatching
+from .utils import CACHE_ENV_VAR
+from .utils import get_errors_for
+from .utils import VariableError
+
+# set once the current environment passed when ensure(export=True), child
+# processes spawned by reloaders inherit it and skip the validation
+VALIDATED_ENV_VAR = "ENV_SHOULD_BE_VALIDATED"
+
+# fingerprint -> errors, for the lifetime of the process
+validated: dict[str, list[VariableError]] = {}
+
+
+def fingerprint(descriptions: list[str], env: dict) -> str:
+    digest = hashlib.sha256()
+    for path in descriptions:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        digest.update(f"{os.path.abspath(path)}\0{mtime}\0".encode())
+    for key, value in sorted(env.items()):
+        digest.update(f"{key}\0{value}\0".encode())
+    return digest.hexdigest()
+
+
+def ensure(
+    descriptions: str | list[str],
+    cache_dir: str | None = None,
+    raise_on_error: bool = True,
+    coerce: bool = False,
+    export: bool = False,
+) -> list[VariableError]:
+    """Forked workers share the in-memory memo, export also records a pass in
+    os.environ for processes started afresh (e.g. a reloader's children)."""
+    if isinstance(descriptions, str):
+        descriptions = [descriptions]
+    env = {key: value for key, value in os.environ.items()
+           if key != VALIDATED_ENV_VAR}
+    key = fingerprint(descriptions, env) + (":coerce" if coerce else "")
+    if key not in validated:
+        if os.environ.get(VALIDATED_ENV_VAR) == key:
+            validated[key] = []
+        else:
+            validated[key] = get_errors_for(
+                env,
+                descriptions,
+                cache_dir=cache_dir or os.environ.get(CACHE_ENV_VAR),
+                coerce=coerce,
+            )
+            if export and not validated[key]:
+                os.environ[VALIDATED_ENV_VAR] = key
+    errors = validated[key]
+    if errors and raise_on_error:
+        failing = ", ".join(
+            f"{variable} ({', '.join(fails)})" for e in errors for variable, fails in e.errors
+        )
+        raise EnvironmentNotMatching(
+            f"Env Not matching {', '.join(e.description_path for e in errors)}: {failing}",
+            errors=errors,
+        )
+    return errors
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Callable
+from typing import Iterator
+
+from .utils import file_timing_hooks
+from .utils import Timing
+from .utils import timing_hooks
+
+
+@contextmanager
+def timing_hook(
+    hook: Callable[[Timing], None], rules: bool = True
+) -> Iterator[Callable[[Timing], None]]:
+    """Calls hook with a Timing for every file load, schema build and rule
+    check made inside the block, from whichever thread made it. Without
+    rules, rule checks are left untimed and keep their fast paths."""
+    hooks = timing_hooks if rules else file_timing_hooks
+    hooks.append(hook)
+    try:
+        yield hook
+    finally:
+        hooks.remove(hook)
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    "Nearest rank, ordered is sorted and not empty."
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Stats:
+    "A timing hook that sums up where the time went, by rule, key and file."
+
+    def __init__(self):
+        # rule name -> each check's time
+        self.rules: dict[str, list[float]] = {}
+        self.keys: dict[str, float] = {}
+        # path -> stage -> seconds
+        self.files: dict[str, dict[str, float]] = {}
+
+    def __call__(self, timing: Timing) -> None:
+        if timing.stage == "rule":
+            self.rules.setdefault(timing.rule, []).append(timing.seconds)
+            spent = self.keys.get(timing.key, 0.0)
+            self.keys[timing.key] = spent + timing.seconds
+            return
+        stages = self.files.setdefault(timing.path, {})
+        stages[timing.stage] = stages.get(timing.stage, 0.0) + timing.seconds
+
+    @property
+    def total(self) -> float:
+        return sum(map(sum, self.rules.values())) + sum(
+            sum(stages.values()) for stages in self.files.values())
+
+    def slowest_keys(self, count: int = 10) -> list[tuple[str, float]]:
+        return sorted(self.keys.items(), key=lambda item: -item[1])[:count]
+
+    def report(self, count: int = 10) -> str:
+        checks = sum(map(len, self.rules.values()))
+        lines = [f"stats: {self.total * 1e3:.3f}ms timed, "
+                 f"{len(self.files)} files, {checks} rule checks"]
+        if self.rules:
+            lines.append(
+                f"  {'rule':<20}{'checks':>8}{'total ms':>12}{'p50 us':>10}{'p95 us':>10}")
+        for name, seconds in sorted(self.rules.items(), key=lambda item: -sum(item[1])):
+            ordered = sorted(seconds)
+            lines.append(
+                f"  {name:<20}{len(ordered):>8}{sum(ordered) * 1e3:>12.3f}"
+                f"{percentile(ordered, 0.5) * 1e6:>10.1f}{percentile(ordered, 0.95) * 1e6:>10.1f}"
+            )
+        if self.keys:
+            lines.append("slowest keys:")
+        for key, seconds in self.slowest_keys(count):
+            lines.append(f"  {key:<30}{seconds * 1e3:>10.3f}ms")
+        if self.files:
+            lines.append("files:")
+        for path, stages in self.files.items():
+            spent = "  ".join(f"{stage} {seconds * 1e3:.3f}ms"
+                              for stage, seconds in stages.items())
+            lines.append(f"  {path}  {spent}")
+        return "\n".join(lines) + "\n"
@@ -1,24 +1,47 @@
 from __future__ import annotations
 
-import inspect
 import os
 import re
+import weakref
+from bisect import bisect_left
 from dataclasses import dataclass
 from dataclasses import field
+from functools import cache
 from functools import wraps
 from io import TextIOWrapper
-from json import JSONDecodeError
-from json import load
+from time import perf_counter
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
 
-from yaml import safe_load
-from yaml.scanner import ScannerError
-
+from . import __version__
 from . import description as all_descriptions
 from .exception import DescriptionFileNotLoading
+from .exception import DescriptionInheritanceCycle
 from .exception import FileHasNoExtension
 from .exception import RequiredVariableNotSet
+from .exception import UnsafeRegexWarning
+from .patterns import combine_patterns
+from .patterns import CombinedRegex
+from .patterns import does_pass_within
+from .patterns import is_unsafe
+from .patterns import regex_of
+from .patterns import TIMEOUT
+
+CACHE_ENV_VAR = "ENV_SHOULD_BE_CACHE"
+# merged rule checks are split across workers in chunks of this size
+CHUNK_SIZE = 256
+# bump whenever the layout of cache entries changes
+CACHE_FORMAT = 4
+ENV_FILE_BUFFER_SIZE = 1 << 16
+ESCAPES = {"n": "\n", "r": "\r", "t": "\t", '"': '"', "\\": "\\", "$": "$"}
+INT_PATTERN = re.compile(r"[-+]?[0-9]+\Z")
+FLOAT_PATTERN = re.compile(
+    r"[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?\Z")
+BOOLEANS = {"true": True, "false": False}
 
 
 @dataclass
@@ -27,42 +50,142 @@ class VariableError:
     errors: list[VariableError] = field(default_factory=list)
 
 
+@dataclass(frozen=True)
+class Timing:
+    stage: str  # "load", "cache" (a cached schema read), "compile" or "rule"
+    seconds: float
+    path: str | None = None  # file loaded or description compiled
+    key: str | None = None  # rule checks only
+    rule: str | None = None
+
+
+# called with a Timing for every file load, schema build and rule check,
+# nothing is timed while it's empty (see env_should_be.stats)
+timing_hooks: list[Callable[[Timing], None]] = []
+# only called for file loads and schema builds, rules run untimed for them
+file_timing_hooks: list[Callable[[Timing], None]] = []
+
+
+def emit_timing(timing: Timing) -> None:
+    for hook in timing_hooks:
+        hook(timing)
+    if timing.stage != "rule":
+        for hook in file_timing_hooks:
+            hook(timing)
+
+
 def file_to_dictionary(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         file_path = args[0]
         if not os.path.isfile(file_path):
             raise FileNotFoundError(f"{file_path} does not exist.")
+        start = perf_counter() if timing_hooks or file_timing_hooks else None
         with open(file_path) as file:
             data: dict = func(*args, file=file, **kwargs)
+        if start != None:
+            emit_timing(Timing("load", perf_counter() - start, path=file_path))
         return data
 
     return wrapper
 
 
+def find_closing_quote(value: str) -> int:
+    quote = value[0]
+    if quote == "'":
+        return value.find(quote, 1)
+    index = 1
+    while index < len(value):
+        if value[index] == "\\":
+            # a backslash escapes the next character, including the quote
+            index += 2
+            continue
+        if value[index] == quote:
+            return index
+        index += 1
+    return -1
+
+
+def unquote_env_value(value: str, line_number: int) -> str:
+    quote = value[0]
+    end = find_closing_quote(value)
+    if end == -1:
+        raise ValueError(f"line {line_number}: unterminated {quote} quote")
+    rest = value[end + 1:].strip()
+    if rest and not rest.startswith("#"):
+        raise ValueError(
+            f"line {line_number}: unexpected characters after the closing quote")
+    value = value[1:end]
+    if quote == '"' and "\\" in value:
+        value = re.sub(r"\\(.)", lambda m: ESCAPES.get(
+            m[1], "\\" + m[1]), value)
+    return value
+
+
+def parse_env_lines(lines: Iterable[str | bytes]) -> Iterator[tuple[str, str]]:
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode()
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[7:].lstrip()
+        key, separator, value = line.partition("=")
+        key = key.strip()
+        if not separator or not key:
+            raise ValueError(
+                f"line {line_number}: expected KEY=VALUE, got {line!r}")
+        value = value.strip()
+        if value[:1] in ("'", '"'):
+            value = unquote_env_value(value, line_number)
+        elif " #" in value or "\t#" in value:
+            value = re.split(r"\s#", value, maxsplit=1)[0].rstrip()
+        yield key, value
+
+
+def iter_env_file(file_path: str) -> Iterator[tuple[str, str]]:
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"{file_path} does not exist.")
+    with open(file_path, "rb", buffering=ENV_FILE_BUFFER_SIZE) as file:
+        yield from parse_env_lines(file)
+
+
 @file_to_dictionary
 def load_env_file(file_path: str, file: TextIOWrapper = None) -> dict:
     if file == None:
         raise SystemError()
-    env_vars = {}
-    for line in file:
-        if not line.startswith("#"):
-            key, value = line.strip().split("=")
-            env_vars[key] = value
-    return env_vars
+    return dict(parse_env_lines(file))
+
+
+@cache
+def get_yaml_loader() -> type:
+    import logging
+
+    import yaml
+
+    # libyaml's loader is several times faster, but PyYAML may be built without it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    logging.getLogger(__name__).debug(
+        f"loading yaml descriptions with {loader.__name__}")
+    return loader
 
 
 @file_to_dictionary
 def load_yaml_file(file_path: str, file: TextIOWrapper = None) -> dict:
     if file == None:
         raise SystemError()
-    return safe_load(file)
+    from yaml import load
+
+    return load(file, Loader=get_yaml_loader())
 
 
 @file_to_dictionary
 def load_json_file(file_path: str, file: TextIOWrapper = None) -> dict:
     if file == None:
         raise SystemError()
+    from json import load
+
     return load(file)
 
 
@@ -85,51 +208,728 @@ def to_snake_case(name):
     return name.lower()
 
 
-def is_valid_env(expected_env: dict, actual_env: dict) -> bool | None:
-    invalid_vars = []
+RULES: dict[str, type[all_descriptions.Description]] = {
+    to_snake_case(name): getattr(all_descriptions, name)
+    for name in sorted(all_descriptions.__all__)
+}
+RULE_NAMES = {klass: name for name, klass in RULES.items()}
+
+
+def coerce_value(value: Any) -> Any:
+    "The int, float or bool an env string spells, anything else is returned as is."
+    if not isinstance(value, str):
+        return value
+    try:
+        if INT_PATTERN.match(value):
+            return int(value)
+        if FLOAT_PATTERN.match(value):
+            return float(value)
+    except ValueError:
+        # e.g. more digits than int() accepts
+        return value
+    return BOOLEANS.get(value.lower(), value)
+
+
+@dataclass(frozen=True)
+class CompiledKey:
+    name: str
+    required: bool
+    rules: tuple[tuple[str, all_descriptions.Description], ...]
+
+    def check(
+        self,
+        actual_env: dict,
+        cache: ResultCache | None = None,
+        coerce: bool = False,
+        regex_timeout: float | None = None,
+    ) -> list[str]:
+        value = actual_env.get(self.name, None)
+        if value == None:
+            if self.required:
+                raise RequiredVariableNotSet(
+                    f"{self.name} is_required not but set")
+            return []
+        # parsed once, shared by every numeric/range rule on the key
+        typed = coerce_value(value) if coerce else value
+        does_pass = cache.does_pass if cache != None else None
+        timed = len(timing_hooks) > 0
+        fails = []
+        for name, rule in self.rules:
+            actual = typed if rule.typed else value
+            if timed:
+                start = perf_counter()
+            if regex_timeout != None:
+                passed = does_pass_within(rule, actual, regex_timeout)
+            elif does_pass != None:
+                passed = does_pass(rule, actual)
+            else:
+                passed = rule.does_pass(actual)
+            if timed:
+                emit_timing(Timing(
+                    "rule", perf_counter() - start, key=self.name, rule=name))
+            if passed == TIMEOUT:
+                fails.append(f"{name}:{TIMEOUT}")
+            elif not passed:
+                fails.append(name)
+        return fails
+
+
+@dataclass(frozen=True)
+class CompiledDescription:
+    keys: tuple[CompiledKey, ...] = ()
+
+    def validate(
+        self,
+        actual_env: dict,
+        cache: ResultCache | None = None,
+        coerce: bool = False,
+        regex_timeout: float | None = None,
+    ) -> list[list[Any]] | bool:
+        invalid_vars = []
+        for key in self.keys:
+            fails = key.check(actual_env, cache, coerce, regex_timeout)
+            if len(fails) > 0:
+                invalid_vars.append([key.name, fails])
+        invalid_vars.sort(key=lambda fail: fail[0])
+        return invalid_vars if len(invalid_vars) > 0 else True
+
+
+# (rule class, frozen argument) -> the one shared instance of that rule,
+# for as long as some compiled description still uses it
+interned: weakref.WeakValueDictionary[tuple, all_descriptions.Description] = (
+    weakref.WeakValueDictionary())
+
+
+def intern_rule(
+    klass: type, value: Any, trusted: bool = False
+) -> all_descriptions.Description:
+    """Rules are immutable, so every `is_int: true` in a process can be the same
+    object. trusted values were validated before (e.g. when compiled to .esb)."""
+    build = klass.trusted if trusted else klass
+    try:
+        key = (klass, freeze(value))
+        hash(key)
+    except TypeError:
+        return build(value)
+    rule = interned.get(key)
+    if rule == None:
+        rule = interned.setdefault(key, build(value))
+    return rule
+
+
+def compile_description(expected_env: dict) -> CompiledDescription:
+    keys: list[CompiledKey] = []
     for key, values in expected_env.items():
-        fails: list[str] = []
-        for name, klass in inspect.getmembers(all_descriptions):
-            klass_name = to_snake_case(name)
-            if klass_name not in values:
-                # user did not use this description
-                continue
-            description = klass(values[klass_name])
-            value = actual_env.get(key, None)
-            is_required = values.get("required", True)
-            if is_required and value == None:
-                raise RequiredVariableNotSet(f"{key} is_required not but set")
-            if value != None and not description.does_pass(value):
-                fails.append(klass_name)
-        if len(fails) > 0:
-            invalid_vars.append([key, fails])
-    invalid_vars.sort(key=lambda fail: fail[0])
-    return invalid_vars if len(invalid_vars) > 0 else True
-
-
-def get_errors_for(env: dict, descriptions: list[str]) -> list[VariableError]:
-    errors: list[VariableError] = []
-    for path in descriptions:
-        extension = get_file_extension(path)
+        rules = tuple(
+            (name, intern_rule(klass, values[name]))
+            for name, klass in RULES.items()
+            if name in values
+        )
+        if len(rules) == 0:
+            # nothing to check for this variable
+            continue
+        keys.append(
+            CompiledKey(
+                name=key,
+                required=values.get("required", True),
+                rules=rules,
+            )
+        )
+    return CompiledDescription(keys=tuple(keys))
+
+
+def freeze(value: Any) -> Any:
+    "Hashable stand-in for a rule argument, typed so that 1, 1.0 and True differ."
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    return (type(value).__name__, value)
+
+
+class ResultCache:
+    "Bounded LRU of rule outcomes keyed by (rule class, argument, value)."
+
+    def __init__(self, maxsize: int = 65536):
+        from collections import OrderedDict
+        from threading import Lock
+
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple, bool] = OrderedDict()
+        # rule -> its part of the entry keys, dropped along with the rule
+        self.rule_keys: weakref.WeakKeyDictionary[all_descriptions.Description, tuple] = (
+            weakref.WeakKeyDictionary())
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def rule_key(self, rule: all_descriptions.Description) -> tuple:
+        key = self.rule_keys.get(rule)
+        if key == None:
+            key = self.rule_keys[rule] = (type(rule), freeze(rule.value))
+        return key
+
+    def does_pass(self, rule: all_descriptions.Description, actual: Any) -> bool:
+        key = (self.rule_key(rule), type(actual), actual)
         try:
-            if extension == ".json":
-                description: dict = load_json_file(path)
-            elif extension in [".yml", ".yaml"]:
-                description: dict = load_yaml_file(path)
+            with self.lock:
+                outcome = self.entries[key]
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return outcome
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable value, nothing to share
+            self.misses += 1
+            return rule.does_pass(actual)
+        outcome = rule.does_pass(actual)
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = outcome
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return outcome
+
+    def does_pass_many(
+        self, rule: all_descriptions.Description, actuals: list[Any]
+    ) -> list[bool]:
+        rule_key = self.rule_key(rule)
+        outcomes: list = [None] * len(actuals)
+        pending: dict[tuple, list[int]] = {}  # unseen value -> its positions
+        unhashable: list[int] = []
+        with self.lock:
+            for index, actual in enumerate(actuals):
+                key = (rule_key, type(actual), actual)
+                try:
+                    outcomes[index] = self.entries[key]
+                except KeyError:
+                    pending.setdefault(key, []).append(index)
+                    continue
+                except TypeError:
+                    unhashable.append(index)
+                    continue
+                self.entries.move_to_end(key)
+                self.hits += 1
+        firsts = [positions[0] for positions in pending.values()] + unhashable
+        if not firsts:
+            return outcomes
+        fresh = rule.does_pass_many([actuals[index] for index in firsts])
+        with self.lock:
+            self.misses += len(firsts)
+            for (key, positions), outcome in zip(pending.items(), fresh):
+                self.entries[key] = outcome
+                self.hits += len(positions) - 1
+                for index in positions:
+                    outcomes[index] = outcome
+            for index, outcome in zip(unhashable, fresh[len(pending):]):
+                outcomes[index] = outcome
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return outcomes
+
+
+@dataclass(frozen=True)
+class IndexedKey:
+    name: str
+    required: bool
+    # rule name, position in RuleIndex.checks
+    rules: tuple[tuple[str, int], ...]
+
+
+@dataclass(frozen=True)
+class RuleIndex:
+    checks: tuple[tuple[str, all_descriptions.Description], ...]
+    plans: tuple[tuple[IndexedKey, ...], ...]  # one per description
+    # key, one pass over all of its regexes, their positions in checks
+    combined: tuple[tuple[str, CombinedRegex, tuple[int, ...]], ...] = ()
+    # positions checked one rule at a time (sorted), None when that's all of them
+    singles: tuple[int, ...] | None = None
+
+    def outcomes(
+        self,
+        env: dict,
+        start: int = 0,
+        stop: int | None = None,
+        cache: ResultCache | None = None,
+        coerce: bool = False,
+        regex_timeout: float | None = None,
+    ) -> list[bool | str | None]:
+        does_pass = cache.does_pass if cache != None else None
+        if stop == None or stop > len(self.checks):
+            stop = len(self.checks)
+        outcomes: list[bool | str | None] = [None] * max(stop - start, 0)
+        typed: dict[str, Any] = {}  # key -> coerced value, parsed once
+        # timed runs check every rule on its own, so each gets its own time
+        timed = len(timing_hooks) > 0
+        if self.singles == None or timed:
+            singles = range(start, stop)
+        else:
+            singles = self.singles[
+                bisect_left(self.singles, start): bisect_left(self.singles, stop)]
+        checks = self.checks
+        for position in singles:
+            key, rule = checks[position]
+            value = env.get(key, None)
+            if value == None:
+                continue
+            if coerce and rule.typed:
+                if key not in typed:
+                    typed[key] = coerce_value(value)
+                value = typed[key]
+            if timed:
+                began = perf_counter()
+            if regex_timeout != None:
+                outcomes[position - start] = does_pass_within(
+                    rule, value, regex_timeout)
+            elif does_pass != None:
+                outcomes[position - start] = does_pass(rule, value)
             else:
-                raise FileHasNoExtension(
-                    f"make sure the description file ends with: .json/.yaml/.yml"
-                )
-        except (
-            FileNotFoundError,
-            JSONDecodeError,
-            ScannerError,
-            ValueError,
-        ) as exc:
+                outcomes[position - start] = rule.does_pass(value)
+            if timed:
+                emit_timing(Timing("rule", perf_counter() - began,
+                                   key=key, rule=RULE_NAMES[type(rule)]))
+        # the rest a key at a time, one match for all of its regexes
+        whole = start == 0 and stop == len(checks)
+        for key, combined, positions in self.combined if not timed else ():
+            value = env.get(key, None)
+            if value == None or positions[-1] < start or positions[0] >= stop:
+                continue
+            markers = combined.markers_of(value)
+            if whole:
+                for position, marker in zip(positions, markers):
+                    outcomes[position] = marker != None
+                continue
+            for position, marker in zip(positions, markers):
+                if start <= position < stop:
+                    outcomes[position - start] = marker != None
+        return outcomes
+
+    def attribute(
+        self, env: dict, outcomes: list[bool | str | None]
+    ) -> list[list[list[Any]] | bool]:
+        results: list[list[list[Any]] | bool] = []
+        for plan in self.plans:
+            invalid_vars = []
+            for key in plan:
+                if env.get(key.name, None) == None:
+                    if key.required:
+                        raise RequiredVariableNotSet(
+                            f"{key.name} is_required not but set")
+                    continue
+                fails = [
+                    f"{name}:{TIMEOUT}" if outcomes[index] == TIMEOUT else name
+                    for name, index in key.rules
+                    if outcomes[index] != True
+                ]
+                if len(fails) > 0:
+                    invalid_vars.append([key.name, fails])
+            invalid_vars.sort(key=lambda fail: fail[0])
+            results.append(invalid_vars if len(invalid_vars) > 0 else True)
+        return results
+
+    def validate(
+        self,
+        env: dict,
+        cache: ResultCache | None = None,
+        coerce: bool = False,
+        regex_timeout: float | None = None,
+    ) -> list[list[list[Any]] | bool]:
+        return self.attribute(
+            env,
+            self.outcomes(env, cache=cache, coerce=coerce,
+                          regex_timeout=regex_timeout),
+        )
+
+
+def build_rule_index(
+    schemas: list[CompiledDescription], combine_regexes: bool = True
+) -> RuleIndex:
+    """Merges descriptions so each distinct (key, rule, argument) runs once,
+    and the regexes layered on a same key in a single pass when possible."""
+    positions: dict[tuple[str, str, Any], int] = {}
+    checks: list[tuple[str, all_descriptions.Description]] = []
+    regexes: dict[str, list[int]] = {}  # key -> positions of its regex checks
+    plans = []
+    for schema in schemas:
+        plan = []
+        for key in schema.keys:
+            rules = []
+            for name, rule in key.rules:
+                slot = (key.name, name, freeze(rule.value))
+                if slot not in positions:
+                    positions[slot] = len(checks)
+                    checks.append((key.name, rule))
+                    if regex_of(rule) != None:
+                        regexes.setdefault(key.name, []).append(
+                            positions[slot])
+                rules.append((name, positions[slot]))
+            plan.append(IndexedKey(key.name, key.required, tuple(rules)))
+        plans.append(tuple(plan))
+    combined = []
+    for key, members in regexes.items() if combine_regexes else ():
+        if len(members) < 2:
+            continue
+        pattern = combine_patterns(
+            [regex_of(checks[index][1]) for index in members])
+        if pattern == None:
+            # backreferences, named groups or inline flags: one match each
+            continue
+        combined.append((key, pattern, tuple(members)))
+    return RuleIndex(
+        checks=tuple(checks),
+        plans=tuple(plans),
+        combined=tuple(combined),
+        singles=tuple(
+            sorted(set(range(len(checks))).difference(
+                *(members for _, _, members in combined)))
+        ) if combined else None,
+    )
+
+
+def is_valid_env(
+    expected_env: dict, actual_env: dict, coerce: bool = False
+) -> list[list[Any]] | bool:
+    return compile_description(expected_env).validate(actual_env, coerce=coerce)
+
+
+DESCRIPTION_EXTENSIONS = (".json", ".yml", ".yaml")
+
+
+def parse_description(path: str, content: bytes) -> dict:
+    if get_file_extension(path) == ".json":
+        from json import loads as parse
+
+        parse_errors = ()  # JSONDecodeError is a ValueError
+    else:
+        from yaml import load
+        from yaml import YAMLError
+
+        def parse(content):
+            return load(content, Loader=get_yaml_loader())
+
+        parse_errors = (YAMLError,)
+    try:
+        return parse(content)
+    except (ValueError, *parse_errors) as exc:
+        raise DescriptionFileNotLoading(
+            f"couldn't load file at:{path}, {exc}")
+
+
+def read_description_file(path: str) -> bytes:
+    if get_file_extension(path) not in DESCRIPTION_EXTENSIONS:
+        raise FileHasNoExtension(
+            f"make sure the description file ends with: .json/.yaml/.yml"
+        )
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except OSError as exc:
+        reason = f"{path} does not exist." if not os.path.exists(path) else exc
+        raise DescriptionFileNotLoading(
+            f"couldn't load file at:{path}, {reason}")
+
+
+def load_description_file(path: str) -> dict:
+    "The description as written, see resolve_description for its extends: bases."
+    start = perf_counter() if timing_hooks or file_timing_hooks else None
+    description = parse_description(path, read_description_file(path))
+    if start != None:
+        emit_timing(Timing("load", perf_counter() - start, path=path))
+    return description
+
+
+def get_digest(content: bytes) -> str:
+    import hashlib
+
+    return hashlib.sha256(content).hexdigest()
+
+
+# (absolute path, content digest) -> a base description, parsed once per process
+parsed_bases: dict[tuple[str, str], dict] = {}
+
+
+def load_base(path: str, cache_dir: str | None = None) -> tuple[dict, str]:
+    "A description reached through extends: and its digest, memoized on both."
+    content = read_description_file(path)
+    digest = get_digest(content)
+    key = (os.path.abspath(path), digest)
+    if key in parsed_bases:
+        return parsed_bases[key], digest
+    cache_file = None if cache_dir == None else os.path.join(
+        cache_dir, f"{get_digest(f'{__version__}:{CACHE_FORMAT}:{key}'.encode())}.base.cache")
+    description = read_cache_entry(cache_file) if cache_file != None else None
+    if not isinstance(description, dict):
+        start = perf_counter() if timing_hooks or file_timing_hooks else None
+        description = parse_description(path, content)
+        if start != None:
+            emit_timing(Timing("load", perf_counter() - start, path=path))
+        if not isinstance(description, dict):
             raise DescriptionFileNotLoading(
-                f"couldn't load file at:{path}, {exc}")
-        is_valid = is_valid_env(description, env)
+                f"couldn't load file at:{path}, a base description must be a mapping")
+        if cache_file != None:
+            write_cache_entry(cache_file, description)
+    return parsed_bases.setdefault(key, description), digest
+
+
+def merge_description(base: dict, own: dict) -> dict:
+    "own's keys and rules override base's, a null one removes it."
+    merged = {key: dict(rules) if isinstance(rules, dict) else rules
+              for key, rules in base.items()}
+    for key, rules in own.items():
+        if rules == None:
+            merged.pop(key, None)
+        elif isinstance(rules, dict) and isinstance(merged.get(key), dict):
+            for name, value in rules.items():
+                if value == None:
+                    merged[key].pop(name, None)
+                else:
+                    merged[key][name] = value
+        elif isinstance(rules, dict):
+            merged[key] = {
+                name: value for name, value in rules.items() if value != None}
+        else:
+            merged[key] = rules
+    return merged
+
+
+def resolve_description(
+    path: str, cache_dir: str | None = None, chain: tuple[str, ...] = ()
+) -> tuple[dict, tuple[tuple[str, str], ...]]:
+    """The description at path merged over its extends: bases (in order, a
+    path or a list of paths relative to the file), and the (absolute path,
+    digest) of every base it was built from, path included when it's one."""
+    absolute = os.path.abspath(path)
+    if absolute in chain:
+        cycle = " -> ".join(chain[chain.index(absolute):] + (absolute,))
+        raise DescriptionInheritanceCycle(
+            f"couldn't load file at:{path}, extends cycle: {cycle}")
+    bases: list[tuple[str, str]] = []
+    if len(chain) == 0:
+        description = load_description_file(path)
+    else:
+        description, digest = load_base(path, cache_dir)
+        bases.append((absolute, digest))
+    if not isinstance(description, dict) or "extends" not in description:
+        return description, tuple(bases)
+    own = {
+        key: rules for key, rules in description.items() if key != "extends"}
+    extends = description["extends"]
+    if isinstance(extends, str):
+        extends = [extends]
+    if not isinstance(extends, list) or not all(isinstance(base, str) for base in extends):
+        raise DescriptionFileNotLoading(
+            f"couldn't load file at:{path}, extends: takes a path or a list of paths")
+    merged: dict = {}
+    for base in extends:
+        base_description, base_bases = resolve_description(
+            os.path.join(os.path.dirname(path), base), cache_dir, chain + (absolute,))
+        merged = merge_description(merged, base_description)
+        bases += base_bases
+    return merge_description(merged, own), tuple(dict.fromkeys(bases))
+
+
+def get_cache_key(path: str, content: bytes) -> str:
+    stat = os.stat(path)
+    key = f"{__version__}:{CACHE_FORMAT}:{os.path.abspath(path)}:{stat.st_mtime_ns}:{get_digest(content)}"
+    return get_digest(key.encode())
+
+
+def read_cache_entry(cache_file: str) -> Any | None:
+    """Entries are marshalled plain data (never pickles, the directory may be
+    writable by others) and only trusted when written by the current user."""
+    import marshal
+
+    try:
+        with open(cache_file, "rb") as file:
+            if hasattr(os, "getuid") and os.fstat(file.fileno()).st_uid != os.getuid():
+                return None
+            return marshal.loads(file.read())
+    except Exception:
+        # missing, truncated or written by an incompatible version
+        return None
+
+
+def write_cache_entry(cache_file: str, entry: Any) -> None:
+    import marshal
+    import tempfile
+
+    try:
+        content = marshal.dumps(entry)
+    except ValueError:
+        # e.g. a yaml date in a description, just not cached
+        return
+    cache_dir = os.path.dirname(cache_file)
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(content)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        # a read-only or full cache dir should never block validation
+        pass
+
+
+def bases_unchanged(bases: tuple[tuple[str, str], ...]) -> bool:
+    for path, digest in bases:
+        try:
+            with open(path, "rb") as file:
+                if get_digest(file.read()) != digest:
+                    return False
+        except OSError:
+            return False
+    return True
+
+
+def read_cached_schema(
+    cache_file: str,
+) -> tuple[CompiledDescription, tuple[tuple[str, str, str], ...]] | None:
+    """The schema and its unsafe patterns, None unless the entry is intact
+    and every base it extends is unchanged."""
+    from .esb import table_to_schema
+
+    # the rule table, the digests of the bases it extends, its unsafe patterns
+    entry = read_cache_entry(cache_file)
+    try:
+        table, bases, unsafe = entry
+        if not bases_unchanged(bases):
+            return None
+        return table_to_schema(table), tuple(tuple(pattern) for pattern in unsafe)
+    except (TypeError, ValueError, KeyError):
+        return None
+
+
+def find_unsafe_patterns(schema: CompiledDescription) -> tuple[tuple[str, str, str], ...]:
+    "(key, rule name, pattern) of the regexes is_unsafe flags, worked out once per build."
+    return tuple(
+        (key.name, name, rule.value)
+        for key in schema.keys
+        for name, rule in key.rules
+        if isinstance(rule, all_descriptions.Regex) and is_unsafe(rule.value)
+    )
+
+
+def warn_unsafe_patterns(unsafe: tuple[tuple[str, str, str], ...], path: str) -> None:
+    if not unsafe:
+        return
+    import warnings
+
+    for key, name, pattern in unsafe:
+        warnings.warn(
+            f"{path}: {key} {name} {pattern!r} nests unbounded "
+            "quantifiers and can backtrack catastrophically, consider a regex timeout",
+            UnsafeRegexWarning,
+            stacklevel=3,
+        )
+
+
+def build_schema(
+    path: str, cache_dir: str | None = None
+) -> tuple[CompiledDescription, tuple[tuple[str, str], ...]]:
+    description, bases = resolve_description(path, cache_dir)
+    start = perf_counter() if timing_hooks or file_timing_hooks else None
+    schema = compile_description(description)
+    if start != None:
+        emit_timing(Timing("compile", perf_counter() - start, path=path))
+    return schema, bases
+
+
+def load_schema(path: str, cache_dir: str | None = None) -> CompiledDescription:
+    if get_file_extension(path) == ".esb":
+        # already compiled, nothing to parse or cache
+        from .esb import load_esb
+
+        return load_esb(path)
+    if cache_dir == None or not os.path.isfile(path):
+        schema, _ = build_schema(path)
+        warn_unsafe_patterns(find_unsafe_patterns(schema), path)
+        return schema
+    with open(path, "rb") as file:
+        content = file.read()
+    cache_file = os.path.join(
+        cache_dir, f"{get_cache_key(path, content)}.cache")
+    start = perf_counter() if timing_hooks or file_timing_hooks else None
+    cached = read_cached_schema(cache_file)
+    if cached != None:
+        # no pattern is parsed again on a warm start, the flags are stored
+        schema, unsafe = cached
+        if start != None:
+            emit_timing(Timing("cache", perf_counter() - start, path=path))
+    else:
+        from .esb import schema_to_table
+
+        schema, bases = build_schema(path, cache_dir)
+        unsafe = find_unsafe_patterns(schema)
+        write_cache_entry(cache_file, (schema_to_table(schema), bases, unsafe))
+    warn_unsafe_patterns(unsafe, path)
+    return schema
+
+
+def get_errors_for(
+    env: dict,
+    descriptions: list[str],
+    cache_dir: str | None = None,
+    jobs: int = 1,
+    result_cache: ResultCache | None = None,
+    coerce: bool = False,
+    regex_timeout: float | None = None,
+) -> list[VariableError]:
+    if jobs > 1:
+        index, outcomes = validate_in_parallel(
+            env, descriptions, cache_dir, jobs, result_cache, coerce, regex_timeout)
+    else:
+        # a merged pattern would run outside of the per-rule budget
+        index = build_rule_index(
+            [load_schema(path, cache_dir) for path in descriptions],
+            combine_regexes=regex_timeout == None,
+        )
+        outcomes = index.outcomes(
+            env, cache=result_cache, coerce=coerce, regex_timeout=regex_timeout)
+    return collect_errors(descriptions, index.attribute(env, outcomes))
+
+
+def collect_errors(
+    descriptions: list[str], results: list[list[list[Any]] | bool]
+) -> list[VariableError]:
+    errors: list[VariableError] = []
+    for path, is_valid in zip(descriptions, results):
         if is_valid != True:
             errors.append(VariableError(
                 description_path=path, errors=is_valid))
     return errors
+
+
+def validate_in_parallel(
+    env: dict,
+    descriptions: list[str],
+    cache_dir: str | None,
+    jobs: int,
+    result_cache: ResultCache | None = None,
+    coerce: bool = False,
+    regex_timeout: float | None = None,
+) -> tuple[RuleIndex, list[bool | str | None]]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # map() yields (and re-raises) in submission order, which keeps
+        # both the merged outcomes and the first reported failure stable
+        index = build_rule_index(
+            list(executor.map(lambda path: load_schema(
+                path, cache_dir), descriptions)),
+            combine_regexes=regex_timeout == None,
+        )
+        parts = executor.map(
+            lambda start: index.outcomes(
+                env, start, start + CHUNK_SIZE, result_cache, coerce, regex_timeout),
+            range(0, len(index.checks), CHUNK_SIZE),
+        )
+        return index, [outcome for part in parts for outcome in part]
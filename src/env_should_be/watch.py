@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import os
+import select
+import struct
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Callable
+from typing import Iterator
+
+from .exception import DescriptionFileNotLoading
+from .exception import RequiredVariableNotSet
+from .exception import ValueUnassignableToDescription
+from .utils import compile_description
+from .utils import CompiledKey
+from .utils import get_file_extension
+from .utils import load_env_file
+from .utils import resolve_description
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    def __init__(self, paths: list[str], interval: float = 1.0):
+        self.interval = interval
+        self.mtimes = {path: self.mtime_of(path) for path in paths}
+
+    @staticmethod
+    def mtime_of(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def wait(self) -> set[str]:
+        while True:
+            time.sleep(self.interval)
+            changed = set()
+            for path, mtime in self.mtimes.items():
+                current = self.mtime_of(path)
+                if current != mtime:
+                    self.mtimes[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    "Watches the parent directories, editors usually replace files by renaming."
+
+    def __init__(self, paths: list[str], interval: float = 1.0):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # give writers a moment to finish before reporting a change
+        self.settle = min(interval, 0.1)
+        self.watched: dict[int, dict[str, str]] = {}
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        for path in paths:
+            directory, name = os.path.split(os.path.abspath(path))
+            wd = self.libc.inotify_add_watch(
+                self.fd, directory.encode(), mask)
+            if wd < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(),
+                              f"can't watch {directory}")
+            self.watched.setdefault(wd, {})[name] = path
+
+    def read_events(self) -> Iterator[tuple[int, str]]:
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(buffer):
+            wd, _, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset: offset + length].rstrip(b"\0").decode()
+            offset += length
+            yield wd, name
+
+    def wait(self) -> set[str]:
+        changed: set[str] = set()
+        while not changed:
+            select.select([self.fd], [], [])
+            time.sleep(self.settle)
+            for wd, name in self.read_events():
+                path = self.watched.get(wd, {}).get(name)
+                if path != None:
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def get_watcher(paths: list[str], interval: float = 1.0):
+    try:
+        return InotifyWatcher(paths, interval)
+    except (OSError, AttributeError, TypeError):
+        # not linux, or no libc inotify symbols
+        return PollingWatcher(paths, interval)
+
+
+@dataclass
+class Transition:
+    description_path: str
+    key: str
+    fails: list[str] = field(default_factory=list)  # empty: newly passing
+
+
+class WatchState:
+    "Keeps the last parsed env/descriptions to re-check only what changed."
+
+    def __init__(
+        self,
+        env: dict,
+        descriptions: dict[str, dict],
+        coerce: bool = False,
+        regex_timeout: float | None = None,
+    ):
+        self.env = env
+        self.coerce = coerce
+        self.regex_timeout = regex_timeout
+        self.descriptions = descriptions
+        self.compiled: dict[str, dict[str, CompiledKey]] = {
+            path: self.compile_keys(description)
+            for path, description in descriptions.items()
+        }
+        self.failing: dict[tuple[str, str], list[str]] = {}
+        self.evaluations = 0
+        for path, keys in self.compiled.items():
+            self.check(path, keys)
+
+    @staticmethod
+    def compile_keys(description: dict) -> dict[str, CompiledKey]:
+        return {key.name: key for key in compile_description(description).keys}
+
+    def check(self, path: str, keys) -> list[Transition]:
+        transitions = []
+        compiled = self.compiled[path]
+        for name in sorted(keys):
+            key = compiled.get(name)
+            try:
+                fails = key.check(
+                    self.env, coerce=self.coerce, regex_timeout=self.regex_timeout
+                ) if key != None else []
+            except RequiredVariableNotSet:
+                fails = ["required"]
+            self.evaluations += 1
+            before = self.failing.pop((path, name), [])
+            if fails:
+                self.failing[(path, name)] = fails
+            if fails != before:
+                transitions.append(Transition(path, name, fails))
+        return transitions
+
+    def update_env(self, env: dict) -> list[Transition]:
+        changed = {
+            key for key in self.env.keys() | env.keys() if self.env.get(key) != env.get(key)
+        }
+        self.env = env
+        transitions = []
+        for path, compiled in self.compiled.items():
+            transitions += self.check(path, changed & compiled.keys())
+        return transitions
+
+    def update_description(self, path: str, description: dict) -> list[Transition]:
+        before = self.descriptions[path]
+        changed = {
+            key
+            for key in before.keys() | description.keys()
+            if before.get(key) != description.get(key)
+        }
+        compiled = self.compiled[path]
+        fresh = self.compile_keys(
+            {key: description[key] for key in changed if key in description}
+        )
+        for key in changed:
+            compiled.pop(key, None)
+        compiled.update(fresh)
+        self.descriptions[path] = description
+        return self.check(path, changed)
+
+
+# usually a half-written file, watch() keeps the last good state
+LOAD_ERRORS = (
+    DescriptionFileNotLoading,
+    FileNotFoundError,
+    ValueError,
+    ValueUnassignableToDescription,
+)
+
+
+def read_description(path: str) -> tuple[dict, tuple[str, ...]]:
+    "The description at path and the absolute paths of the bases it extends."
+    if get_file_extension(path) == ".esb":
+        from .esb import load_esb
+        from .esb import schema_to_description
+
+        # bases were merged in at compile time
+        return schema_to_description(load_esb(path)), ()
+    description, bases = resolve_description(path)
+    if not isinstance(description, dict):
+        # e.g. an emptied yaml file, mid-save
+        raise DescriptionFileNotLoading(
+            f"couldn't load file at:{path}, expected a mapping of keys to rules")
+    return description, tuple(base for base, _ in bases)
+
+
+def watch(
+    descriptions: list[str],
+    env_file: str | None,
+    env: dict,
+    report: Callable[[list[Transition]], None],
+    on_error: Callable[[Exception], None],
+    interval: float = 1.0,
+    coerce: bool = False,
+    regex_timeout: float | None = None,
+) -> None:
+    loaded = {path: read_description(path) for path in descriptions}
+    state = WatchState(
+        env,
+        {path: description for path, (description, _) in loaded.items()},
+        coerce,
+        regex_timeout,
+    )
+    bases = {path: base_paths for path, (_, base_paths) in loaded.items()}
+
+    def watched() -> list[str]:
+        paths = list(descriptions) + ([env_file] if env_file else [])
+        return list(dict.fromkeys(paths + [base for found in bases.values() for base in found]))
+
+    paths = watched()
+    watcher = get_watcher(paths, interval)
+    try:
+        while True:
+            transitions = []
+            changed = watcher.wait()
+            if env_file in changed:
+                try:
+                    transitions += state.update_env(load_env_file(env_file))
+                except LOAD_ERRORS as exc:
+                    on_error(exc)
+            changed = {os.path.abspath(path) for path in changed}
+            for path in descriptions:
+                # a description is re-resolved when it or any of its bases changed
+                if os.path.abspath(path) not in changed and changed.isdisjoint(bases[path]):
+                    continue
+                try:
+                    description, bases[path] = read_description(path)
+                    transitions += state.update_description(path, description)
+                except LOAD_ERRORS as exc:
+                    on_error(exc)
+            if watched() != paths:
+                # an extends: was added or removed
+                watcher.close()
+                paths = watched()
+                watcher = get_watcher(paths, interval)
+            if transitions:
+                report(transitions)
+    finally:
+        watcher.close()
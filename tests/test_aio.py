@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from env_should_be import aio
+from env_should_be.exception import CallBackNotRunning
+from env_should_be.exception import DescriptionFileNotLoading
+from env_should_be.utils import get_errors_for
+
+
+class TestAsyncApi(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.json_path = os.path.join(self.tmp_dir, "app.json")
+        with open(self.json_path, "w") as file:
+            json.dump({"DB_USER": {"length": 6}}, file)
+        self.yaml_path = os.path.join(self.tmp_dir, "db.yml")
+        with open(self.yaml_path, "w") as file:
+            file.write("DB_HOST:\n  option:\n    - localhost\n")
+        self.env_path = os.path.join(self.tmp_dir, ".env")
+        with open(self.env_path, "w") as file:
+            file.write("DB_USER=me\nDB_HOST=localhost\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_loaders(self):
+        async def load():
+            return await asyncio.gather(
+                aio.load_json_file(self.json_path),
+                aio.load_yaml_file(self.yaml_path),
+                aio.load_env_file(self.env_path),
+            )
+
+        self.assertEqual(
+            asyncio.run(load()),
+            [
+                {"DB_USER": {"length": 6}},
+                {"DB_HOST": {"option": ["localhost"]}},
+                {"DB_USER": "me", "DB_HOST": "localhost"},
+            ],
+        )
+
+    def test_get_errors_for(self):
+        env = {"DB_USER": "me", "DB_HOST": "localhost"}
+        paths = [self.json_path, self.yaml_path]
+        self.assertEqual(
+            asyncio.run(aio.get_errors_for(env, paths)),
+            get_errors_for(env, paths),
+        )
+        with self.assertRaises(DescriptionFileNotLoading):
+            asyncio.run(
+                aio.get_errors_for(env, [self.json_path, "missing.json"]))
+
+    def test_run_callback(self):
+        script = os.path.join(self.tmp_dir, "notify.sh")
+        with open(script, "w") as file:
+            file.write("#!/bin/sh\nexit 3\n")
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        self.assertEqual(asyncio.run(aio.run_callback(script)), 3)
+        with open(script, "w") as file:
+            file.write("#!/bin/sh\ncat > /dev/null\nsleep 30\n")
+        self.assertEqual(
+            asyncio.run(aio.run_callback(
+                script, b'{"errors": []}', timeout=0.5)), None
+        )
+        with self.assertRaises(CallBackNotRunning):
+            asyncio.run(aio.run_callback(
+                os.path.join(self.tmp_dir, "missing.sh")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import operator
+import unittest
+from unittest import mock
+
+from env_should_be.batch import *
+from env_should_be.description import compare_lengths
+from env_should_be.exception import RequiredVariableNotSet
+from env_should_be.utils import is_valid_env
+from env_should_be.utils import ResultCache
+
+
+class TestValidateMany(unittest.TestCase):
+    expected_env = {
+        "DB_USER": {"length": 6, "regex": "^[a-zA-Z0-9]+$"},
+        "DB_PASSWORD": {"min_length": 8, "max_length": 12},
+        "DB_HOST": {"option": ["localhost", "127.0.0.1"], "is_ipv4": True},
+        "APP_ENV": {"option": ["dev", "prod"], "required": False},
+    }
+    envs = [
+        {"DB_USER": "myuser", "DB_PASSWORD": "MyPassw0rd!",
+            "DB_HOST": "127.0.0.1"},
+        {"DB_USER": "my_user", "DB_PASSWORD": "short",
+            "DB_HOST": "localhost", "APP_ENV": "testing"},
+        {"DB_USER": "myuser", "DB_PASSWORD": "MyPassw0rd!AndMore",
+            "DB_HOST": "10.0.0.1", "APP_ENV": "prod"},
+    ]
+
+    def test_matches_is_valid_env(self):
+        matrix = validate_many(self.expected_env, self.envs)
+        for index, env in enumerate(self.envs):
+            expected = is_valid_env(self.expected_env, env)
+            self.assertEqual(matrix.is_valid(index), expected == True)
+            self.assertEqual(matrix.errors(index),
+                             [] if expected == True else expected)
+
+    def test_coerce(self):
+        expected_env = {"PORT": {"is_int": True, "max_length": 4}}
+        envs = [{"PORT": "8080"}, {"PORT": "http"}]
+        matrix = validate_many(expected_env, envs, coerce=True)
+        self.assertEqual(matrix.errors(0), [])
+        self.assertEqual(matrix.errors(1), [["PORT", ["is_int"]]])
+        self.assertEqual(validate_many(expected_env, envs).errors(0), [
+                         ["PORT", ["is_int"]]])
+
+    def test_matrix_layout(self):
+        matrix = validate_many(self.expected_env, self.envs)
+        self.assertEqual(len(matrix.cells), len(
+            matrix.columns) * len(self.envs))
+        column = matrix.columns.index(("APP_ENV", "option"))
+        self.assertEqual(matrix.row(0)[column], SKIPPED)
+        self.assertEqual(matrix.row(1)[column], FAILED)
+        self.assertEqual(matrix.row(2)[column], PASSED)
+
+    def test_missing_does_not_raise(self):
+        env = {"DB_USER": "myuser", "DB_HOST": "localhost"}
+        self.assertRaises(RequiredVariableNotSet,
+                          is_valid_env, self.expected_env, env)
+        matrix = validate_many(self.expected_env, [env])
+        self.assertFalse(matrix.is_valid(0))
+        self.assertEqual(matrix.missing(0), ["DB_PASSWORD"])
+        self.assertEqual(matrix.errors(0), [["DB_HOST", ["is_ipv4"]]])
+
+    def test_result_cache(self):
+        cache = ResultCache()
+        envs = self.envs * 10
+        self.assertEqual(
+            validate_many(self.expected_env, envs, cache=cache),
+            validate_many(self.expected_env, envs),
+        )
+        self.assertGreater(cache.hits, cache.misses)
+
+    def test_large_columns_without_numpy(self):
+        envs = [{"DB_USER": "u" * (index % 10)} for index in range(1000)]
+        description = {"DB_USER": {"max_length": 5, "length": 6}}
+        with mock.patch("env_should_be.description.get_numpy", return_value=None):
+            pure = validate_many(description, envs)
+        self.assertEqual(pure, validate_many(description, envs))
+        for index, env in enumerate(envs):
+            expected = is_valid_env(description, env)
+            self.assertEqual(pure.errors(index), []
+                             if expected == True else expected)
+
+
+class TestCompareLengths(unittest.TestCase):
+    def test_unmeasurable_never_pass(self):
+        lengths = [3, -1, 7] * 200
+        self.assertEqual(
+            compare_lengths(lengths, operator.le, 5), [
+                True, False, False] * 200
+        )
+        self.assertEqual(
+            compare_lengths(lengths[:3], operator.ge, 1), [True, False, True]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+
+from env_should_be.callback import *
+from env_should_be.exception import CallBackNotRunning
+from env_should_be.utils import VariableError
+
+
+class TestRunCallbacks(unittest.TestCase):
+    errors = [
+        VariableError(
+            description_path="app.json",
+            errors=[["DB_HOST", ["option"]], ["DB_USER", ["length", "regex"]]],
+        )
+    ]
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def script(self, name: str, body: str) -> str:
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "w") as file:
+            file.write(f"#!/bin/sh\n{body}\n")
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def test_payload_on_stdin(self):
+        output = os.path.join(self.tmp_dir, "payload.json")
+        callback = self.script("notify.sh", f"cat > {output}")
+        self.assertEqual(run_callbacks(
+            [callback], errors_to_payload(self.errors)), [0])
+        with open(output) as file:
+            self.assertEqual(
+                json.load(file),
+                {
+                    "errors": [
+                        {
+                            "description_path": "app.json",
+                            "variables": [
+                                {"key": "DB_HOST", "rules": ["option"]},
+                                {"key": "DB_USER", "rules": [
+                                    "length", "regex"]},
+                            ],
+                        }
+                    ]
+                },
+            )
+
+    def test_concurrent_with_timeout(self):
+        fast = self.script("fast.sh", "sleep 0.3; exit 2")
+        slow = self.script("slow.sh", "sleep 30")
+        start = time.monotonic()
+        self.assertEqual(run_callbacks(
+            [fast, fast, slow], timeout=1), [2, 2, None])
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_detach(self):
+        slow = self.script("slow.sh", "sleep 2")
+        start = time.monotonic()
+        self.assertEqual(run_callbacks([slow], detach=True), [None])
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_missing_callback(self):
+        with self.assertRaises(CallBackNotRunning):
+            run_callbacks([os.path.join(self.tmp_dir, "missing.sh")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import unittest
+
+
+class TestColdStart(unittest.TestCase):
+    def test_lazy_imports(self):
+        lazy = ["yaml", "subprocess", "logging", "json", "hashlib", "pickle"]
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, env_should_be.cli; "
+                f"print(','.join(m for m in {lazy!r} if m in sys.modules))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(completed.stdout.strip(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
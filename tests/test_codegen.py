@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from env_should_be.codegen import generate_python
+from env_should_be.exception import RequiredVariableNotSet
+from env_should_be.utils import compile_description
+from env_should_be.utils import is_valid_env
+
+
+class TestGeneratePython(unittest.TestCase):
+    expected_env = {
+        "DB_USER": {"length": 6, "regex": "^[a-zA-Z0-9]+$"},
+        "DB_PASSWORD": {"min_length": 8, "max_length": 12, "is_str": True},
+        "DB_HOST": {"option": ["localhost", "127.0.0.1"], "is_ipv4": True},
+        "DB_PORT": {"option": [5432, [1]], "is_int": True, "is_number": True},
+        "RATIO": {
+            "is_float": True,
+            "is_greater_than_eq": 0,
+            "is_lower_than_eq": 1.5,
+            "required": False,
+        },
+        "CACHE": {"constant": "redis://cache:6379/1", "required": False},
+        "ADMIN": {"is_email": True, "required": False},
+        "SITE": {"is_https": True, "is_http": True, "required": False},
+        "ID": {"is_uuid": True, "required": False},
+        "HOST6": {"is_ipv6": True, "required": False},
+    }
+    envs = [
+        {"DB_USER": "myuser", "DB_PASSWORD": "MyPassw0rd!",
+            "DB_HOST": "127.0.0.1", "DB_PORT": 5432},
+        {"DB_USER": "my_user", "DB_PASSWORD": "short", "DB_HOST": "localhost",
+            "DB_PORT": "5432", "RATIO": 2.5, "CACHE": "redis://cache:6379/2"},
+        {"DB_USER": "myuser", "DB_PASSWORD": 12345678, "DB_HOST": "10.0.0.1",
+            "DB_PORT": True, "RATIO": 0.5, "ADMIN": "me@example.com",
+            "SITE": "http://example.com", "ID": "9e107d9d-12b1-4efc-9e88-df2c99bcb8dd",
+            "HOST6": "::1"},
+        {"DB_USER": "myuser", "DB_PASSWORD": "MyPassw0rd!", "DB_HOST": "localhost",
+            "DB_PORT": [1], "ADMIN": "nope", "ID": "nope", "HOST6": "1.2.3.4"},
+    ]
+
+    def load(self, expected_env):
+        namespace: dict = {}
+        exec(generate_python(compile_description(expected_env)), namespace)
+        return namespace
+
+    def test_same_results_as_is_valid_env(self):
+        validate = self.load(self.expected_env)["validate"]
+        for env in self.envs:
+            with self.subTest(env=env):
+                self.assertEqual(validate(env), is_valid_env(
+                    self.expected_env, env))
+
+    def test_coerce(self):
+        namespace: dict = {}
+        exec(generate_python(compile_description(
+            self.expected_env), coerce=True), namespace)
+        envs = self.envs + [
+            {"DB_USER": "myuser", "DB_PASSWORD": "MyPassw0rd!", "DB_HOST": "localhost",
+                "DB_PORT": "5432", "RATIO": "0.5"},
+            {"DB_USER": "myuser", "DB_PASSWORD": "MyPassw0rd!", "DB_HOST": "localhost",
+                "DB_PORT": "true", "RATIO": "1e9"},
+        ]
+        for env in envs:
+            with self.subTest(env=env):
+                self.assertEqual(namespace["validate"](env), is_valid_env(
+                    self.expected_env, env, coerce=True))
+
+    def test_required(self):
+        namespace = self.load(self.expected_env)
+        env = dict(self.envs[0])
+        del env["DB_HOST"]
+        self.assertRaises(RequiredVariableNotSet,
+                          is_valid_env, self.expected_env, env)
+        self.assertRaises(
+            namespace["RequiredVariableNotSet"], namespace["validate"], env)
+
+    def test_cli(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            description = os.path.join(tmp_dir, "desc.json")
+            with open(description, "w") as file:
+                file.write('{"DB_USER": {"length": 6}}')
+            output = os.path.join(tmp_dir, "validator.py")
+            subprocess.run(
+                [sys.executable, "-m", "env_should_be.cli", "compile",
+                    description, "--to-python", output],
+                check=True,
+            )
+            completed = subprocess.run(
+                [sys.executable, "-S", "-c",
+                    "import validator; print(validator.validate({'DB_USER': 'me'}))"],
+                cwd=tmp_dir,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(completed.stdout.strip(),
+                             "[['DB_USER', ['length']]]")
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from env_should_be.esb import dump_esb
+from env_should_be.esb import ESB_FORMAT
+from env_should_be.esb import load_esb
+from env_should_be.esb import MAGIC
+from env_should_be.esb import write_esb
+from env_should_be.exception import DescriptionFileNotLoading
+from env_should_be.exception import StaleCompiledDescription
+from env_should_be.utils import compile_description
+from env_should_be.utils import get_errors_for
+
+DESCRIPTION = {
+    "DB_USER": {"length": 6, "required": False},
+    "DB_PORT": {"is_int": True, "is_greater_than_eq": 1024},
+    "DB_HOST": {"option": ["localhost", "db"], "regex": "^[a-z]+$"},
+    "SITE": {"is_https": True, "max_length": 64},
+    "RATIO": {"is_lower_than_eq": 0.5, "constant": 0.25},
+}
+
+
+class TestEsb(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "desc.esb")
+        self.schema = compile_description(DESCRIPTION)
+        write_esb(self.path, self.schema)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, content: bytes) -> None:
+        with open(self.path, "wb") as file:
+            file.write(content)
+
+    def test_round_trip(self):
+        loaded = load_esb(self.path)
+        self.assertEqual(
+            [(key.name, key.required, [name for name, _ in key.rules])
+             for key in loaded.keys],
+            [(key.name, key.required, [name for name, _ in key.rules])
+             for key in self.schema.keys],
+        )
+        for env in (
+            {"DB_USER": "myuser", "DB_PORT": 5432, "DB_HOST": "db",
+             "SITE": "https://example.com", "RATIO": 0.25},
+            {"DB_PORT": "x", "DB_HOST": "remote",
+                "SITE": "http://example.com", "RATIO": 1},
+        ):
+            self.assertEqual(loaded.validate(env), self.schema.validate(env))
+
+    def test_rules_are_not_validated_again(self):
+        with mock.patch.dict("env_should_be.utils.interned", clear=True), mock.patch(
+            "env_should_be.description.Description.__init__",
+            side_effect=AssertionError("rule validated again"),
+        ):
+            self.assertEqual(len(load_esb(self.path).keys), len(DESCRIPTION))
+
+    def test_stale_format(self):
+        content = dump_esb(self.schema)
+        self.write(MAGIC + (ESB_FORMAT + 1).to_bytes(2,
+                   "little") + content[len(MAGIC) + 2:])
+        with self.assertRaises(StaleCompiledDescription) as context:
+            load_esb(self.path)
+        self.assertIn("compile it again", str(context.exception))
+
+    def test_not_an_esb_file(self):
+        for content in (b"", b"DB_USER: {length: 6}", dump_esb(self.schema)[:-3]):
+            self.write(content)
+            self.assertRaises(DescriptionFileNotLoading, load_esb, self.path)
+
+    def test_get_errors_for(self):
+        errors = get_errors_for(
+            {"DB_PORT": "5432", "DB_HOST": "db",
+                "SITE": "https://example.com", "RATIO": "0.25"},
+            [self.path],
+            coerce=True,
+        )
+        self.assertEqual(errors, [])
+
+    def test_cli(self):
+        source = os.path.join(self.root, "desc.yml")
+        target = os.path.join(self.root, "compiled.esb")
+        with open(source, "w") as file:
+            file.write("PORT: {is_int: true, regex: '[0-9]+'}\n")
+        completed = subprocess.run(
+            [sys.executable, "-m", "env_should_be.cli", "compile", source, "-o", target])
+        self.assertEqual(completed.returncode, 0)
+        completed = subprocess.run(
+            [sys.executable, "-m", "env_should_be.cli", "-d", target, "--coerce"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PORT": "x"},
+        )
+        self.assertEqual(completed.returncode, 1)
+        self.assertIn(
+            "PORT, failing to match ['is_int', 'regex']", completed.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from env_should_be.exception import DescriptionFileNotLoading
+from env_should_be.exception import DescriptionInheritanceCycle
+from env_should_be.utils import get_errors_for
+from env_should_be.utils import load_schema
+from env_should_be.utils import merge_description
+from env_should_be.utils import parse_description
+from env_should_be.utils import parsed_bases
+from env_should_be.utils import resolve_description
+
+
+class TestExtends(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.root, "cache")
+        self.write("base/base.json", {
+            "DB_USER": {"length": 6},
+            "DB_PORT": {"is_int": True, "required": False},
+            "DEBUG": {"option": ["0", "1"]},
+        })
+        self.write("base/web.yml",
+                   "extends: base.json\nHOST: {min_length: 2}\n")
+        self.write("service.yml", "\n".join([
+            "extends: [base/web.yml]",
+            "DB_USER: {length: null, min_length: 2}",
+            "DEBUG: null",
+            "PORT: {regex: '[0-9]+'}",
+        ]))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        parsed_bases.clear()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def write(self, name: str, content) -> None:
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        with open(self.path(name), "w") as file:
+            file.write(content if isinstance(
+                content, str) else json.dumps(content))
+
+    def test_merge_description(self):
+        self.assertEqual(
+            merge_description(
+                {"A": {"length": 1, "regex": "a"}, "B": {"length": 2}},
+                {"A": {"length": 3, "regex": None}, "B": None,
+                    "C": {"regex": None, "length": 1}},
+            ),
+            {"A": {"length": 3}, "C": {"length": 1}},
+        )
+
+    def test_resolve(self):
+        description, bases = resolve_description(self.path("service.yml"))
+        self.assertEqual(description, {
+            "DB_USER": {"min_length": 2},
+            "DB_PORT": {"is_int": True, "required": False},
+            "HOST": {"min_length": 2},
+            "PORT": {"regex": "[0-9]+"},
+        })
+        self.assertEqual([path for path, _ in bases],
+                         [self.path("base/web.yml"), self.path("base/base.json")])
+
+    def test_validation(self):
+        errors = get_errors_for({"DB_USER": "me", "HOST": "h", "PORT": "80", "DEBUG": "yes"},
+                                [self.path("service.yml"), self.path("base/base.json")])
+        self.assertEqual([(e.description_path, e.errors) for e in errors], [
+            (self.path("service.yml"), [["HOST", ["min_length"]]]),
+            (self.path("base/base.json"),
+             [["DB_USER", ["length"]], ["DEBUG", ["option"]]]),
+        ])
+
+    def test_bases_are_parsed_once(self):
+        self.write("other.json", {"extends": "base/web.yml"})
+        resolve_description(self.path("service.yml"))
+        with mock.patch("env_should_be.utils.parse_description", wraps=parse_description) as parse:
+            description, _ = resolve_description(self.path("other.json"))
+        self.assertEqual([call.args[0] for call in parse.call_args_list], [
+                         self.path("other.json")])
+        self.assertIn("HOST", description)
+
+    def test_bases_are_cached(self):
+        load_schema(self.path("service.yml"), self.cache_dir)
+        self.assertEqual(
+            sum(entry.endswith(".base.cache") for entry in os.listdir(self.cache_dir)), 2)
+        parsed_bases.clear()
+        self.write("other.json", {"extends": "base/web.yml"})
+        with mock.patch("env_should_be.utils.parse_description", wraps=parse_description) as parse:
+            load_schema(self.path("other.json"), self.cache_dir)
+        self.assertEqual([call.args[0] for call in parse.call_args_list], [
+                         self.path("other.json")])
+
+    def test_base_change_invalidates_cached_schema(self):
+        env = {"DB_USER": "myuser", "HOST": "host", "PORT": "80"}
+        schema = load_schema(self.path("service.yml"), self.cache_dir)
+        self.assertEqual(schema.validate(env), True)
+        self.write("base/base.json", {"HOST": {"length": 2}})
+        schema = load_schema(self.path("service.yml"), self.cache_dir)
+        self.assertEqual(schema.validate(env), [["HOST", ["length"]]])
+
+    def test_cycle(self):
+        self.write("base/base.json", {"extends": "../service.yml"})
+        with self.assertRaises(DescriptionInheritanceCycle) as context:
+            get_errors_for({}, [self.path("service.yml")])
+        self.assertIn("service.yml -> ", str(context.exception))
+        self.assertIsInstance(context.exception, DescriptionFileNotLoading)
+
+    def test_missing_or_invalid_base(self):
+        self.write("missing.json", {"extends": "nowhere.json"})
+        self.assertRaises(DescriptionFileNotLoading,
+                          resolve_description, self.path("missing.json"))
+        self.write("invalid.json", {"extends": {"path": "base/base.json"}})
+        self.assertRaises(DescriptionFileNotLoading,
+                          resolve_description, self.path("invalid.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from env_should_be.fleet import chunked
+from env_should_be.fleet import compile_fleet_validator
+from env_should_be.fleet import find_env_files
+from env_should_be.fleet import validate_fleet
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.description = os.path.join(self.root, "desc.json")
+        with open(self.description, "w") as file:
+            json.dump({"DB_USER": {"length": 6}, "PORT": {
+                      "is_int": True, "required": False}}, file)
+        services = {
+            "api": "DB_USER=myuser\n",
+            "web": "DB_USER=me\nPORT=80\n",
+            "jobs/worker": "PORT=80\n",
+            "broken": "DB_USER\n",
+        }
+        for service, content in services.items():
+            os.makedirs(os.path.join(self.root, service))
+            with open(os.path.join(self.root, service, ".env"), "w") as file:
+                file.write(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def summary(self, jobs, coerce=False):
+        validator = compile_fleet_validator([self.description], coerce=coerce)
+        results = validate_fleet(find_env_files(
+            self.root), validator, jobs=jobs)
+        return {
+            os.path.relpath(result.path, self.root): (
+                [[e.description_path, e.errors] for e in result.errors],
+                result.problem != None,
+            )
+            for result in results
+        }
+
+    def test_find_env_files(self):
+        self.assertEqual(
+            [os.path.relpath(path, self.root)
+             for path in find_env_files(self.root)],
+            ["api/.env", "broken/.env", "jobs/worker/.env", "web/.env"],
+        )
+        self.assertEqual(find_env_files(self.root, "*/.env")[-1],
+                         os.path.join(self.root, "web/.env"))
+
+    def test_results(self):
+        self.assertEqual(
+            self.summary(jobs=1),
+            {
+                "api/.env": ([], False),
+                "broken/.env": ([], True),
+                "jobs/worker/.env": ([], True),
+                "web/.env": ([[self.description, [["DB_USER", ["length"]], ["PORT", ["is_int"]]]]], False),
+            },
+        )
+        self.assertEqual(self.summary(jobs=1, coerce=True)["web/.env"],
+                         ([[self.description, [["DB_USER", ["length"]]]]], False))
+
+    def test_unreadable_file(self):
+        os.makedirs(os.path.join(self.root, "dir/.env"))
+        validator = compile_fleet_validator([self.description])
+        result = validator.validate(os.path.join(self.root, "dir/.env"))
+        self.assertIn("couldn't load file at:", result.problem)
+        with mock.patch("builtins.open", side_effect=PermissionError(13, "Permission denied")):
+            result = validator.validate(os.path.join(self.root, "api/.env"))
+        self.assertIn("Permission denied", result.problem)
+
+    def test_process_pool_matches_sequential(self):
+        self.assertEqual(self.summary(jobs=2), self.summary(jobs=1))
+
+    def test_chunked(self):
+        paths = [str(index) for index in range(10)]
+        chunks = chunked(paths, jobs=2)
+        self.assertEqual(sum(chunks, []), paths)
+        self.assertEqual(len(chunks), 5)
+
+    def test_cli(self):
+        completed = subprocess.run(
+            [sys.executable, "-m", "env_should_be.cli", "fleet", "--root", self.root,
+                "-d", self.description, "-j", "2"],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(completed.returncode, 1)
+        self.assertIn("3 of 4 env files not matching", completed.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
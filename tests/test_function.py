@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import json
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 
+import yaml
+from env_should_be.description import Regex
 from env_should_be.utils import *
+from yaml import safe_load
 from yaml.scanner import ScannerError
 
 
@@ -21,6 +27,56 @@ class TestEnvFileFunctions(unittest.TestCase):
         file_path = "invalid_file.env"
         self.assertRaises(FileNotFoundError, load_env_file, file_path)
 
+    def test_load_env_file_syntax(self):
+        file_path = "test_syntax.env"
+        with open(file_path, "w") as file:
+            file.write(
+                "# comment\n"
+                "\n"
+                "export DB_USER=myuser\n"
+                "SECRET=c2VjcmV0==\n"
+                "DB_URL = postgres://u:p@h/db?sslmode=require\n"
+                'GREETING="hello \\"you\\" # still inside" # comment\n'
+                "RAW='$HOME\\n'\n"
+                "PLAIN=value # comment\n"
+                "EMPTY=\n"
+            )
+        try:
+            self.assertEqual(
+                load_env_file(file_path),
+                {
+                    "DB_USER": "myuser",
+                    "SECRET": "c2VjcmV0==",
+                    "DB_URL": "postgres://u:p@h/db?sslmode=require",
+                    "GREETING": 'hello "you" # still inside',
+                    "RAW": "$HOME\\n",
+                    "PLAIN": "value",
+                    "EMPTY": "",
+                },
+            )
+            self.assertEqual(
+                dict(iter_env_file(file_path)), load_env_file(file_path))
+        finally:
+            os.remove(file_path)
+
+    def test_load_env_file_malformed(self):
+        for content in ["NO_SEPARATOR\n", 'OPEN="never closed\n', "=value\n"]:
+            with self.subTest(content=content):
+                self.assertRaises(ValueError, dict,
+                                  parse_env_lines(content.splitlines()))
+
+    def test_iter_env_file_is_lazy(self):
+        file_path = "test_lazy.env"
+        with open(file_path, "w") as file:
+            file.write("A=1\nB=2\n")
+        try:
+            pairs = iter_env_file(file_path)
+            self.assertEqual(next(pairs), ("A", "1"))
+            self.assertEqual(list(pairs), [("B", "2")])
+        finally:
+            os.remove(file_path)
+        self.assertRaises(FileNotFoundError, next, iter_env_file(file_path))
+
     def test_load_all_env_vars(self):
         env_vars = load_all_env_vars()
         self.assertIsInstance(env_vars, dict)
@@ -74,6 +130,177 @@ class TestGetErrorsForEnv(unittest.TestCase):
         self.assertRaises(FileHasNoExtension, get_errors_for, env, [file_path])
 
 
+class TestSchemaCache(unittest.TestCase):
+    test_file_path = "cached_description.json"
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        with open(self.test_file_path, "w") as file:
+            json.dump({"DB_USER": {"length": 6}}, file)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+        if os.path.exists(self.test_file_path):
+            os.remove(self.test_file_path)
+
+    def test_warm_start_skips_parsing(self):
+        cold = load_schema(self.test_file_path, self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        with mock.patch(
+            "env_should_be.utils.load_description_file",
+            side_effect=AssertionError("description was parsed again"),
+        ):
+            warm = load_schema(self.test_file_path, self.cache_dir)
+        self.assertEqual(warm.validate({"DB_USER": "myuser"}), True)
+        self.assertEqual(
+            warm.validate({"DB_USER": "me"}), cold.validate({"DB_USER": "me"})
+        )
+
+    def test_content_change_invalidates(self):
+        load_schema(self.test_file_path, self.cache_dir)
+        with open(self.test_file_path, "w") as file:
+            json.dump({"DB_USER": {"length": 2}}, file)
+        errors = get_errors_for(
+            {"DB_USER": "me"}, [self.test_file_path], cache_dir=self.cache_dir
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_corrupt_entry_is_rebuilt(self):
+        load_schema(self.test_file_path, self.cache_dir)
+        (entry,) = os.listdir(self.cache_dir)
+        with open(os.path.join(self.cache_dir, entry), "wb") as file:
+            file.write(b"not a pickle")
+        schema = load_schema(self.test_file_path, self.cache_dir)
+        self.assertEqual(schema.validate({"DB_USER": "me"}), [
+                         ["DB_USER", ["length"]]])
+
+    def test_entries_are_never_unpickled(self):
+        import pickle
+
+        marker = os.path.join(self.cache_dir, "unpickled")
+
+        class Planted:
+            def __reduce__(self):
+                return (open, (marker, "w"))
+
+        load_schema(self.test_file_path, self.cache_dir)
+        (entry,) = os.listdir(self.cache_dir)
+        with open(os.path.join(self.cache_dir, entry), "wb") as file:
+            pickle.dump(Planted(), file)
+        schema = load_schema(self.test_file_path, self.cache_dir)
+        self.assertFalse(os.path.exists(marker))
+        self.assertEqual(schema.validate({"DB_USER": "me"}), [
+                         ["DB_USER", ["length"]]])
+
+    def test_cache_dir_is_private(self):
+        cache_dir = os.path.join(self.cache_dir, "nested")
+        load_schema(self.test_file_path, cache_dir)
+        self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+
+    @unittest.skipUnless(hasattr(os, "getuid") and os.getuid() == 0, "needs to chown")
+    def test_entries_of_other_users_are_ignored(self):
+        load_schema(self.test_file_path, self.cache_dir)
+        (entry,) = os.listdir(self.cache_dir)
+        os.chown(os.path.join(self.cache_dir, entry), 12345, -1)
+        with mock.patch("env_should_be.utils.load_description_file",
+                        wraps=load_description_file) as load:
+            load_schema(self.test_file_path, self.cache_dir)
+        self.assertEqual(load.call_count, 1)
+
+
+class TestParallelGetErrorsFor(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.paths = []
+        large = {f"KEY_{index:04}": {"max_length": 3} for index in range(600)}
+        for index, description in enumerate(
+            [
+                {"DB_USER": {"length": 6}, "DB_PORT": {"regex": "^[0-9]+$"}},
+                large,
+                {"DB_HOST": {"option": ["localhost"]}},
+            ]
+        ):
+            path = os.path.join(self.tmp_dir, f"description_{index}.json")
+            with open(path, "w") as file:
+                json.dump(description, file)
+            self.paths.append(path)
+        self.env = {f"KEY_{index:04}": "x" *
+                    (index % 5) for index in range(600)}
+        self.env.update(DB_USER="me", DB_PORT="54a2", DB_HOST="localhost")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_same_result_as_sequential(self):
+        sequential = get_errors_for(self.env, self.paths)
+        parallel = get_errors_for(self.env, self.paths, jobs=4)
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(
+            [e.description_path for e in parallel], self.paths[:2])
+        keys = [key for key, _ in parallel[1].errors]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_first_failure_in_order_is_raised(self):
+        env = dict(self.env)
+        del env["DB_USER"]
+        with self.assertRaises(RequiredVariableNotSet):
+            get_errors_for(env, self.paths, jobs=4)
+
+
+class TestRuleIndex(unittest.TestCase):
+    base = {
+        "DATABASE_URL": {"regex": "^postgres://", "min_length": 12},
+        "DB_PORT": {"option": [5432, 5431]},
+    }
+    app = {
+        "DATABASE_URL": {"regex": "^postgres://", "max_length": 64},
+        "DB_PORT": {"option": [5432, 5431], "constant": 5432},
+        "APP_ENV": {"constant": True},
+    }
+
+    def test_distinct_rules_run_once(self):
+        index = build_rule_index(
+            [compile_description(self.base), compile_description(self.app)]
+        )
+        self.assertEqual(
+            sorted((key, type(rule).__name__) for key, rule in index.checks),
+            [
+                ("APP_ENV", "Constant"),
+                ("DATABASE_URL", "MaxLength"),
+                ("DATABASE_URL", "MinLength"),
+                ("DATABASE_URL", "Regex"),
+                ("DB_PORT", "Constant"),
+                ("DB_PORT", "Option"),
+            ],
+        )
+        env = {"DATABASE_URL": "mysql://db:3306/app",
+               "DB_PORT": 5431, "APP_ENV": "True"}
+        with mock.patch.object(
+            Regex, "does_pass", autospec=True, side_effect=Regex.does_pass
+        ) as does_pass:
+            results = index.validate(env)
+        self.assertEqual(does_pass.call_count, 1)
+        self.assertEqual(
+            results,
+            [
+                [["DATABASE_URL", ["regex"]]],
+                [["DATABASE_URL", ["regex"]], ["DB_PORT", ["constant"]]],
+            ],
+        )
+
+    def test_arguments_are_typed(self):
+        index = build_rule_index(
+            [
+                compile_description({"FLAG": {"constant": 1}}),
+                compile_description({"FLAG": {"constant": True}}),
+            ]
+        )
+        self.assertEqual(len(index.checks), 2)
+        self.assertEqual(index.validate({"FLAG": "1"}), [
+                         True, [["FLAG", ["constant"]]]])
+
+
 class TestGetFileExtension(unittest.TestCase):
     def test_json_extension(self):
         file_path = "example.json"
@@ -123,6 +350,17 @@ class TestLoadYAMLFile(unittest.TestCase):
         finally:
             os.remove("test.yaml")  # Clean up the temporary test file
 
+    def test_loader_falls_back_without_libyaml(self):
+        get_yaml_loader.cache_clear()
+        try:
+            with mock.patch.dict(yaml.__dict__, {"CSafeLoader": yaml.SafeLoader}):
+                del yaml.CSafeLoader
+                self.assertIs(get_yaml_loader(), yaml.SafeLoader)
+        finally:
+            get_yaml_loader.cache_clear()
+        self.assertIs(get_yaml_loader(), getattr(
+            yaml, "CSafeLoader", yaml.SafeLoader))
+
     def test_nonexistent_file(self):
         with self.assertRaises(FileNotFoundError) as context:
             load_yaml_file("nonexistent.yaml")
@@ -1,8 +1,21 @@
 from __future__ import annotations
 
+import gc
+import pickle
 import unittest
+from dataclasses import FrozenInstanceError
+from unittest import mock
 
+from env_should_be.description import Regex
+from env_should_be.exception import ValueUnassignableToDescription
+from env_should_be.utils import build_rule_index
+from env_should_be.utils import coerce_value
+from env_should_be.utils import compile_description
+from env_should_be.utils import intern_rule
+from env_should_be.utils import interned
 from env_should_be.utils import is_valid_env
+from env_should_be.utils import ResultCache
+from env_should_be.utils import RULES
 
 
 class TestIsValidEnv(unittest.TestCase):
@@ -104,5 +117,183 @@ class TestIsValidEnv(unittest.TestCase):
         )
 
 
+class TestCompileDescription(unittest.TestCase):
+    expected_env = {
+        "DB_USER": {"length": 6, "regex": "^[a-zA-Z0-9]+$"},
+        "DB_HOST": {"option": ["localhost", "127.0.0.1"]},
+        "APP_ENV": {"required": False},
+    }
+
+    def test_registry(self):
+        self.assertIs(RULES["regex"], Regex)
+        self.assertNotIn("required", RULES)
+
+    def test_reusable_across_envs(self):
+        schema = compile_description(self.expected_env)
+        self.assertEqual(
+            [key.name for key in schema.keys], ["DB_USER", "DB_HOST"])
+        self.assertEqual(
+            schema.validate(
+                {"DB_USER": "myuser", "DB_HOST": "localhost"}), True
+        )
+        self.assertEqual(
+            schema.validate({"DB_USER": "my_user", "DB_HOST": "localhost"}),
+            [["DB_USER", ["length", "regex"]]],
+        )
+        for env in [
+            {"DB_USER": "myuser", "DB_HOST": "127.0.0.2"},
+            {"DB_USER": "myuser", "DB_HOST": "0.0.0.0"},
+        ]:
+            self.assertEqual(
+                schema.validate(env), is_valid_env(self.expected_env, env))
+
+    def test_immutable(self):
+        schema = compile_description(self.expected_env)
+        with self.assertRaises(FrozenInstanceError):
+            schema.keys = ()
+        with self.assertRaises(FrozenInstanceError):
+            schema.keys[0].required = False
+
+
+class TestResultCache(unittest.TestCase):
+    def test_repeated_values_hit(self):
+        cache = ResultCache()
+        schema = compile_description(
+            {"HOST": {"is_ipv6": True}, "BACKUP_HOST": {"is_ipv6": True}}
+        )
+        env = {"HOST": "::1", "BACKUP_HOST": "::1"}
+        for _ in range(3):
+            self.assertEqual(schema.validate(env, cache), True)
+        self.assertEqual((cache.hits, cache.misses), (5, 1))
+        self.assertAlmostEqual(cache.hit_ratio, 5 / 6)
+
+    def test_values_are_typed(self):
+        cache = ResultCache()
+        rule = RULES["is_int"](True)
+        self.assertTrue(cache.does_pass(rule, 1))
+        self.assertFalse(cache.does_pass(rule, True))
+        self.assertFalse(cache.does_pass(rule, 1.0))
+        self.assertEqual(cache.misses, 3)
+
+    def test_bounded(self):
+        cache = ResultCache(maxsize=2)
+        rule = RULES["length"](1)
+        for value in ["a", "b", "c", "a"]:
+            cache.does_pass(rule, value)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.hits, 0)
+        cache.does_pass(rule, "a")
+        self.assertEqual(cache.hits, 1)
+
+    def test_unhashable_values_bypass(self):
+        cache = ResultCache()
+        rule = RULES["length"](2)
+        self.assertTrue(cache.does_pass(rule, [1, 2]))
+        self.assertEqual(cache.does_pass_many(rule, [[1, 2], "ab", "ab"]), [
+                         True, True, True])
+        self.assertEqual(len(cache), 1)
+
+    def test_rules_are_not_kept_alive(self):
+        cache = ResultCache()
+        rule = RULES["length"](1)
+        cache.does_pass(rule, "a")
+        self.assertEqual(len(cache.rule_keys), 1)
+        del rule
+        gc.collect()
+        self.assertEqual(len(cache.rule_keys), 0)
+
+
+class TestSharedRules(unittest.TestCase):
+    def test_equal_rules_are_shared(self):
+        schema = compile_description(
+            {"A": {"is_int": True, "option": ["x", "y"]}, "B": {
+                "is_int": True, "option": ["x", "y"]}}
+        )
+        a, b = schema.keys
+        self.assertIs(a.rules[0][1], b.rules[0][1])
+        self.assertIs(a.rules[1][1], b.rules[1][1])
+
+    def test_unused_rules_are_released(self):
+        rule = intern_rule(RULES["length"], 123456)
+        key = next(key for key, value in interned.items() if value is rule)
+        del rule
+        gc.collect()
+        self.assertNotIn(key, interned)
+
+    def test_typed_arguments_are_not_shared(self):
+        self.assertIsNot(intern_rule(
+            RULES["constant"], 1), intern_rule(RULES["constant"], "1"))
+        self.assertIsNot(intern_rule(RULES["is_greater_than_eq"], 1),
+                         intern_rule(RULES["is_greater_than_eq"], 1.0))
+
+    def test_rules_are_immutable(self):
+        rule = RULES["min_length"](3)
+        with self.assertRaises(AttributeError):
+            rule.value = 4
+        with self.assertRaises(AttributeError):
+            rule.extra = 1
+        self.assertFalse(hasattr(rule, "__dict__"))
+
+    def test_validated_once_at_construction(self):
+        with self.assertRaises(ValueUnassignableToDescription):
+            RULES["length"](0)
+        with self.assertRaises(ValueUnassignableToDescription):
+            Regex("(")
+
+    def test_pickle_round_trip(self):
+        for rule in [Regex("^a+$"), RULES["option"](["a"]), RULES["is_email"](True)]:
+            with self.subTest(rule=type(rule).__name__):
+                copy = pickle.loads(pickle.dumps(rule))
+                self.assertEqual(type(copy), type(rule))
+                self.assertEqual(copy.value, rule.value)
+                self.assertEqual(copy.does_pass("aa"), rule.does_pass("aa"))
+
+
+class TestCoercion(unittest.TestCase):
+    expected_env = {
+        "PORT": {"is_int": True, "is_greater_than_eq": 1, "is_lower_than_eq": 65535, "max_length": 5},
+        "RATIO": {"is_float": True, "is_number": True},
+        "DEBUG": {"option": ["true", "false"], "is_str": True},
+    }
+
+    def test_coerce_value(self):
+        for value, expected in [
+            ("8080", 8080), ("-1", -1), ("+2", 2), ("0.5", 0.5), (".5", 0.5),
+            ("1e3", 1000.0), ("True", True), ("false", False), ("08", 8),
+            (" 1", " 1"), ("1_000", "1_000"), ("nan", "nan"), ("", ""), (3, 3),
+        ]:
+            with self.subTest(value=value):
+                coerced = coerce_value(value)
+                self.assertEqual(coerced, expected)
+                self.assertIs(type(coerced), type(expected))
+
+    def test_numeric_rules_see_parsed_values(self):
+        env = {"PORT": "8080", "RATIO": "0.25", "DEBUG": "true"}
+        self.assertEqual(is_valid_env(
+            self.expected_env, env, coerce=True), True)
+        self.assertEqual(
+            is_valid_env(self.expected_env, env),
+            [["PORT", ["is_greater_than_eq", "is_int", "is_lower_than_eq"]],
+             ["RATIO", ["is_float", "is_number"]]],
+        )
+        self.assertEqual(
+            is_valid_env(self.expected_env, {
+                         **env, "PORT": "70000"}, coerce=True),
+            [["PORT", ["is_lower_than_eq"]]],
+        )
+
+    def test_parsed_once_per_key(self):
+        schema = compile_description(self.expected_env)
+        env = {"PORT": "8080", "RATIO": "0.25", "DEBUG": "true"}
+        index = build_rule_index([schema, schema])
+        with mock.patch("env_should_be.utils.coerce_value", wraps=coerce_value) as parse:
+            self.assertEqual(schema.validate(env, coerce=True), True)
+            self.assertEqual(parse.call_count, 3)
+            parse.reset_mock()
+            self.assertEqual(index.validate(env, coerce=True), [True, True])
+            # DEBUG only has string rules
+            self.assertEqual(parse.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from env_should_be.metrics import escape_label
+from env_should_be.metrics import render_metrics
+from env_should_be.metrics import write_metrics
+from env_should_be.stats import Stats
+from env_should_be.stats import timing_hook
+from env_should_be.utils import get_errors_for
+
+
+def samples(text: str) -> dict[str, float]:
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if not line.startswith("#")
+    }
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.description = os.path.join(self.directory.name, "desc.json")
+        with open(self.description, "w") as file:
+            json.dump({
+                "PORT": {"regex": "[0-9]+", "max_length": 2},
+                "HOST": {"regex": "[a-z]+"},
+            }, file)
+        self.cache_dir = os.path.join(self.directory.name, "cache")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def render(self, env: dict) -> dict[str, float]:
+        with timing_hook(Stats()) as stats:
+            errors = get_errors_for(
+                env, [self.description], cache_dir=self.cache_dir)
+        return samples(render_metrics([self.description], errors, stats, 0.5, cached=True))
+
+    def test_render(self):
+        label = f'description="{self.description}"'
+        metrics = self.render({"PORT": "port", "HOST": "1"})
+        self.assertEqual(
+            metrics["env_should_be_validation_duration_seconds"], 0.5)
+        self.assertEqual(metrics["env_should_be_env_matching"], 0)
+        self.assertEqual(metrics[f"env_should_be_failing_keys{{{label}}}"], 2)
+        self.assertEqual(
+            metrics[f'env_should_be_failing_rules{{{label},rule="regex"}}'], 2)
+        self.assertEqual(
+            metrics[f'env_should_be_failing_rules{{{label},rule="max_length"}}'], 1)
+        self.assertGreater(
+            metrics[f"env_should_be_description_parse_duration_seconds{{{label}}}"], 0)
+        self.assertEqual(metrics["env_should_be_schema_cache_hit_ratio"], 0.0)
+
+        metrics = self.render({"PORT": "80", "HOST": "db"})
+        self.assertEqual(metrics["env_should_be_env_matching"], 1)
+        self.assertEqual(metrics[f"env_should_be_failing_keys{{{label}}}"], 0)
+        self.assertEqual(metrics["env_should_be_schema_cache_hit_ratio"], 1.0)
+
+    def test_escape_label(self):
+        self.assertEqual(escape_label('a"b\\c\nd'), 'a\\"b\\\\c\\nd')
+
+    def test_write_is_atomic_and_readable(self):
+        path = os.path.join(self.directory.name, "env.prom")
+        write_metrics(path, "first 1\n")
+        write_metrics(path, "second 2\n")
+        with open(path) as file:
+            self.assertEqual(file.read(), "second 2\n")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), [
+                         "desc.json", "env.prom"])
+
+    def test_cli(self):
+        path = os.path.join(self.directory.name, "env.prom")
+        completed = subprocess.run(
+            [sys.executable, "-m", "env_should_be.cli", "-d", self.description,
+                "--metrics-file", path],
+            capture_output=True,
+            text=True,
+            env={**{key: value for key, value in os.environ.items()
+                    if key != "ENV_SHOULD_BE_CACHE"}, "PORT": "80", "HOST": "db"},
+        )
+        self.assertEqual(completed.returncode, 0)
+        with open(path) as file:
+            metrics = samples(file.read())
+        self.assertEqual(metrics["env_should_be_env_matching"], 1)
+        self.assertNotIn("env_should_be_schema_cache_hit_ratio", metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import re
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+
+from env_should_be.description import IsEmail
+from env_should_be.description import Regex
+from env_should_be.exception import RegexTimeout
+from env_should_be.exception import UnsafeRegexWarning
+from env_should_be.patterns import can_combine
+from env_should_be.patterns import combine_patterns
+from env_should_be.patterns import is_unsafe
+from env_should_be.patterns import regex_of
+from env_should_be.patterns import RegexWorker
+from env_should_be.utils import build_rule_index
+from env_should_be.utils import compile_description
+from env_should_be.utils import get_errors_for
+from env_should_be.utils import load_schema
+from env_should_be.utils import RULES
+
+CATASTROPHIC = "^(a+)+$"
+
+
+class TestCombinePatterns(unittest.TestCase):
+    patterns = [
+        "^(?=.*[A-Z])",
+        "^(?=.*[0-9])",
+        "^.{12,}$",
+        "^[^ ]+$",
+        "(a|b)+c",
+        IsEmail.regex,
+    ]
+    values = ["Passw0rd with space", "CorrectHorse9Battery",
+              "short", "abac", "me@example.com", ""]
+
+    def test_same_outcomes_as_matching_each(self):
+        combined = combine_patterns(self.patterns)
+        for value in self.values:
+            with self.subTest(value=value):
+                self.assertEqual(
+                    combined.outcomes(value),
+                    [re.match(pattern, value) !=
+                     None for pattern in self.patterns],
+                )
+
+    def test_non_strings_never_match(self):
+        self.assertEqual(combine_patterns(
+            ["^1$", ".*"]).outcomes(1), [False, False])
+
+    def test_uncombinable(self):
+        for pattern in [r"(a)\1", r"(?P<x>a)(?P=x)", r"(a)?(?(1)b|c)", "(?i)abc", "(?P<x>a)", "("]:
+            with self.subTest(pattern=pattern):
+                self.assertFalse(can_combine(pattern))
+                self.assertEqual(combine_patterns(["^a", pattern]), None)
+        self.assertTrue(can_combine("(a)(?:b)(?=c)(?i:d)"))
+
+    def test_regex_of(self):
+        self.assertEqual(regex_of(Regex("^a$")), "^a$")
+        self.assertEqual(regex_of(RULES["is_email"](True)), IsEmail.regex)
+        self.assertEqual(regex_of(RULES["min_length"](1)), None)
+
+
+class TestCombinedRuleIndex(unittest.TestCase):
+    base = {"PASSWORD": {"regex": "^(?=.*[A-Z])", "min_length": 8}}
+    strict = {"PASSWORD": {
+        "regex": "^(?=.*[0-9])"}, "ADMIN": {"is_email": True}}
+    audit = {"PASSWORD": {"regex": "^[^ ]+$"}, "ADMIN": {"regex": "^admin@"}}
+
+    def schemas(self):
+        return [compile_description(d) for d in [self.base, self.strict, self.audit]]
+
+    def test_attribution_matches_per_pattern_path(self):
+        combined = build_rule_index(self.schemas())
+        separate = build_rule_index(self.schemas(), combine_regexes=False)
+        self.assertEqual(
+            [(key, members) for key, _, members in combined.combined],
+            [("PASSWORD", (1, 2, 4)), ("ADMIN", (3, 5))],
+        )
+        self.assertEqual(combined.singles, (0,))  # min_length
+        self.assertEqual(separate.combined, ())
+        for env in [
+            {"PASSWORD": "Passw0rd", "ADMIN": "admin@example.com"},
+            {"PASSWORD": "password 1", "ADMIN": "root@example.com"},
+            {"PASSWORD": "PASSWORD", "ADMIN": "admin@"},
+        ]:
+            with self.subTest(env=env):
+                self.assertEqual(combined.validate(env),
+                                 separate.validate(env))
+        self.assertEqual(
+            combined.validate(
+                {"PASSWORD": "password 1", "ADMIN": "root@example.com"}),
+            [[["PASSWORD", ["regex"]]], True,
+             [["ADMIN", ["regex"]], ["PASSWORD", ["regex"]]]],
+        )
+
+    def test_chunks_see_the_same_outcomes(self):
+        index = build_rule_index(self.schemas())
+        env = {"PASSWORD": "password 1", "ADMIN": "admin@example.com"}
+        chunked = [
+            outcome for start in range(len(index.checks))
+            for outcome in index.outcomes(env, start, start + 1)
+        ]
+        self.assertEqual(chunked, index.outcomes(env))
+
+    def test_backreferences_fall_back(self):
+        index = build_rule_index([
+            compile_description({"PAIR": {"regex": r"^(\w)\1"}}),
+            compile_description({"PAIR": {"regex": "^a"}}),
+        ])
+        self.assertEqual(index.combined, ())
+        self.assertEqual(index.validate({"PAIR": "aab"}), [True, True])
+        self.assertEqual(index.validate({"PAIR": "abb"}), [
+                         [["PAIR", ["regex"]]], True])
+
+
+class TestUnsafePatterns(unittest.TestCase):
+    def test_nested_unbounded_quantifiers(self):
+        for pattern in [CATASTROPHIC, r"(\w+\s?)*$", "(?:a*)*", "((ab)*c)*", "(?>(a+)*)"]:
+            with self.subTest(pattern=pattern):
+                self.assertTrue(is_unsafe(pattern))
+        # the domain part of is_email still nests, but delimited by dots
+        local_part = IsEmail.regex.split("@")[0]
+        for pattern in ["(a|b)*", "a*b*", "(a{1,5})*", "(a*+)*", "(?>a+)*", "(", local_part]:
+            with self.subTest(pattern=pattern):
+                self.assertFalse(is_unsafe(pattern))
+
+    def test_email_pattern_is_unchanged(self):
+        previous = re.compile(
+            r"([A-Za-z0-9]+[.-_])*[A-Za-z0-9]+@[A-Za-z0-9-]+(\.[A-Z|a-z]{2,})+")
+        self.assertTrue(is_unsafe(previous.pattern))
+        current = re.compile(IsEmail.regex)
+        for length in range(6):
+            for chars in itertools.product("aZ9.-_@:", repeat=length):
+                value = "".join(chars) + ".com"
+                self.assertEqual(previous.match(value) != None,
+                                 current.match(value) != None, value)
+
+    def test_warned_at_load_time(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "desc.json")
+            with open(path, "w") as file:
+                json.dump({"NAME": {"regex": CATASTROPHIC},
+                          "MAIL": {"is_email": True}}, file)
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                get_errors_for(
+                    {"NAME": "aa", "MAIL": "me@example.com"}, [path])
+        self.assertEqual([w.category for w in caught], [UnsafeRegexWarning])
+        self.assertIn("NAME", str(caught[0].message))
+
+    def test_warm_start_uses_the_stored_flags(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "desc.json")
+            with open(path, "w") as file:
+                json.dump({"NAME": {"regex": CATASTROPHIC},
+                          "SAFE": {"regex": "^b+$"}}, file)
+            with warnings.catch_warnings(record=True):
+                load_schema(path, tmp_dir)
+            with warnings.catch_warnings(record=True) as caught, mock.patch(
+                "env_should_be.utils.is_unsafe",
+                side_effect=AssertionError("pattern parsed again"),
+            ):
+                warnings.simplefilter("always")
+                load_schema(path, tmp_dir)
+        self.assertEqual([w.category for w in caught], [UnsafeRegexWarning])
+        self.assertIn("NAME", str(caught[0].message))
+
+
+class TestRegexBudget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.worker = RegexWorker()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.worker.stop()
+
+    def test_match(self):
+        self.assertTrue(self.worker.match("^a+$", "aaa", 5))
+        self.assertFalse(self.worker.match("^a+$", "ab", 5))
+
+    def test_timeout_restarts_the_worker(self):
+        self.worker.match("^a", "a", 5)
+        before = self.worker.process
+        with self.assertRaises(RegexTimeout):
+            self.worker.match(CATASTROPHIC, "a" * 64 + "!", 0.2)
+        self.assertEqual(self.worker.process, None)
+        self.assertFalse(before.is_alive())
+        self.assertTrue(self.worker.match(CATASTROPHIC, "aaaa", 5))
+
+    def test_restart_is_outside_the_budget(self):
+        with self.assertRaises(RegexTimeout):
+            self.worker.match(CATASTROPHIC, "a" * 64 + "!", 0.2)
+        # the fresh worker's start-up doesn't count against these 50ms
+        self.assertTrue(self.worker.match("^a", "a", 0.05))
+        self.assertFalse(self.worker.match("^b", "a", 0.05))
+
+    def test_timeout_is_its_own_failure(self):
+        schema = compile_description(
+            {"NAME": {"regex": CATASTROPHIC, "max_length": 8}, "OTHER": {"regex": "^b"}})
+        env = {"NAME": "a" * 64 + "!", "OTHER": "a"}
+        expected = [["NAME", ["max_length", "regex:timeout"]],
+                    ["OTHER", ["regex"]]]
+        self.assertEqual(schema.validate(env, regex_timeout=0.2), expected)
+        self.assertEqual(build_rule_index([schema]).validate(
+            env, regex_timeout=0.2), [expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from xml.etree import ElementTree
+
+from env_should_be.reporter import get_reporter
+from env_should_be.reporter import JsonLinesReporter
+from env_should_be.reporter import JsonReporter
+from env_should_be.reporter import JunitReporter
+from env_should_be.reporter import Reporter
+from env_should_be.reporter import TextReporter
+from env_should_be.utils import VariableError
+
+
+class TestReporter(unittest.TestCase):
+    descriptions = ["db.yml", "web.yml"]
+    results = [
+        ("api/.env", [VariableError("db.yml",
+         [["DB_USER", ["length", "regex"]]])], None),
+        ("web/.env", [], None),
+        ("broken/.env", [], "couldn't load file at:broken/.env"),
+    ]
+
+    def render(self, reporter_class, *args):
+        stream = io.StringIO()
+        reporter = reporter_class(stream, self.descriptions, *args)
+        reporter.start()
+        for env, errors, problem in self.results:
+            reporter.report(env, errors, problem)
+        reporter.finish()
+        self.assertEqual((reporter.total, reporter.failing), (3, 2))
+        return stream.getvalue()
+
+    def test_reporter_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Reporter(io.StringIO())
+
+    def test_text(self):
+        self.assertEqual(
+            self.render(TextReporter),
+            "WARNING: Env Not matching db.yml\n"
+            "ERROR: \n DB_USER, failing to match ['length', 'regex']\n"
+            "ERROR: couldn't load file at:broken/.env\n",
+        )
+        fleet = self.render(TextReporter, True, True).splitlines()
+        self.assertEqual(
+            fleet[0], "WARNING: api/.env: Env Not matching db.yml")
+        self.assertIn("DEBUG: web/.env: matching", fleet)
+        self.assertEqual(fleet[-1], "INFO: 2 of 3 env files not matching")
+
+    def test_json(self):
+        report = json.loads(self.render(JsonReporter))
+        self.assertEqual((report["total"], report["failing"]), (3, 2))
+        self.assertEqual([result["ok"]
+                         for result in report["results"]], [False, True, False])
+        self.assertEqual(
+            report["results"][0]["errors"],
+            [{"description_path": "db.yml",
+              "variables": [{"key": "DB_USER", "rules": ["length", "regex"]}]}],
+        )
+
+    def test_jsonl(self):
+        lines = [json.loads(line) for line in self.render(
+            JsonLinesReporter).splitlines()]
+        self.assertEqual(lines, [
+            {"env": "api/.env", "description_path": "db.yml",
+             "key": "DB_USER", "rules": ["length", "regex"]},
+            {"env": "broken/.env", "problem": "couldn't load file at:broken/.env"},
+        ])
+
+    def test_junit(self):
+        suites = ElementTree.fromstring(
+            self.render(JunitReporter)).findall("testsuite")
+        self.assertEqual([suite.get("name") for suite in suites],
+                         ["api/.env", "web/.env", "broken/.env"])
+        api = suites[0].findall("testcase")
+        self.assertEqual([case.get("name") for case in api], self.descriptions)
+        self.assertEqual(api[0].find("failure").get("message"),
+                         "DB_USER failing to match length, regex")
+        self.assertIsNone(api[1].find("failure"))
+        self.assertIsNotNone(suites[2].find("testcase/error"))
+
+    def test_output_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "report.json")
+            reporter = get_reporter("json", path, self.descriptions)
+            reporter.report("api/.env", [])
+            reporter.close()
+            with open(path) as file:
+                self.assertEqual(json.load(file)["total"], 1)
+
+    def test_cli(self):
+        with tempfile.TemporaryDirectory() as directory:
+            description = os.path.join(directory, "desc.json")
+            env_file = os.path.join(directory, ".env")
+            with open(description, "w") as file:
+                json.dump({"PORT": {"is_int": True}}, file)
+            with open(env_file, "w") as file:
+                file.write("PORT=x\n")
+            completed = subprocess.run(
+                [sys.executable, "-m", "env_should_be.cli", "-d", description,
+                    "-e", env_file, "--format", "jsonl"],
+                capture_output=True,
+                text=True,
+            )
+        self.assertEqual(completed.returncode, 1)
+        self.assertEqual(json.loads(completed.stdout)["rules"], ["is_int"])
+        self.assertEqual(completed.stderr, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import env_should_be
+from env_should_be import runtime
+from env_should_be.exception import EnvironmentNotMatching
+
+
+class TestEnsure(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "app.json")
+        with open(self.path, "w") as file:
+            json.dump({"DB_USER": {"length": 6}}, file)
+        runtime.validated.clear()
+        self.environ = mock.patch.dict(os.environ, {"DB_USER": "myuser"})
+        self.environ.start()
+        os.environ.pop(runtime.VALIDATED_ENV_VAR, None)
+
+    def tearDown(self):
+        self.environ.stop()
+        runtime.validated.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_memoized_per_process(self):
+        self.assertEqual(env_should_be.ensure(self.path), [])
+        with mock.patch(
+            "env_should_be.runtime.get_errors_for", side_effect=AssertionError
+        ):
+            self.assertEqual(env_should_be.ensure([self.path]), [])
+
+    def test_environment_is_left_alone(self):
+        env_should_be.ensure(self.path)
+        self.assertNotIn(runtime.VALIDATED_ENV_VAR, os.environ)
+
+    def test_marker_skips_child_processes(self):
+        env_should_be.ensure(self.path, export=True)
+        self.assertIn(runtime.VALIDATED_ENV_VAR, os.environ)
+        # a reloaded/spawned process starts with an empty memo but the marker
+        runtime.validated.clear()
+        with mock.patch(
+            "env_should_be.runtime.get_errors_for", side_effect=AssertionError
+        ):
+            self.assertEqual(env_should_be.ensure(self.path), [])
+
+    def test_environment_change_revalidates(self):
+        env_should_be.ensure(self.path)
+        os.environ["DB_USER"] = "me"
+        with self.assertRaises(EnvironmentNotMatching) as context:
+            env_should_be.ensure(self.path)
+        self.assertEqual(context.exception.errors[0].errors, [
+                         ["DB_USER", ["length"]]])
+        self.assertEqual(
+            len(env_should_be.ensure(self.path, raise_on_error=False)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
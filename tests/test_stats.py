@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from env_should_be.stats import percentile
+from env_should_be.stats import Stats
+from env_should_be.stats import timing_hook
+from env_should_be.utils import file_timing_hooks
+from env_should_be.utils import get_errors_for
+from env_should_be.utils import is_valid_env
+from env_should_be.utils import timing_hooks
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.description = os.path.join(self.directory.name, "desc.json")
+        with open(self.description, "w") as file:
+            json.dump({
+                "PORT": {"is_int": True, "regex": "[0-9]+"},
+                "HOST": {"regex": "[a-z]+", "min_length": 2},
+            }, file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_percentile(self):
+        ordered = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(ordered, 0.5), 51.0)
+        self.assertEqual(percentile(ordered, 0.95), 96.0)
+        self.assertEqual(percentile([3.0], 0.95), 3.0)
+
+    def test_hook_sees_every_stage(self):
+        timings = []
+        with timing_hook(timings.append):
+            get_errors_for({"PORT": "80", "HOST": "db"}, [self.description])
+        self.assertEqual(timing_hooks, [])
+        self.assertEqual([t.stage for t in timings[:2]], ["load", "compile"])
+        self.assertEqual({t.path for t in timings[:2]}, {self.description})
+        # combined regexes are checked one by one while timed
+        self.assertEqual(
+            sorted((t.key, t.rule) for t in timings if t.stage == "rule"),
+            [("HOST", "min_length"), ("HOST", "regex"),
+             ("PORT", "is_int"), ("PORT", "regex")],
+        )
+        self.assertTrue(all(t.seconds >= 0 for t in timings))
+
+    def test_file_timings_only(self):
+        timings = []
+        with timing_hook(timings.append, rules=False):
+            errors = get_errors_for(
+                {"PORT": "x", "HOST": "db"}, [self.description])
+        self.assertEqual((timing_hooks, file_timing_hooks), ([], []))
+        self.assertEqual([t.stage for t in timings], ["load", "compile"])
+        self.assertEqual(errors[0].errors, [["PORT", ["is_int", "regex"]]])
+
+    def test_same_results_while_timed(self):
+        env = {"PORT": "x", "HOST": "d"}
+        with timing_hook(Stats()):
+            timed = get_errors_for(env, [self.description, self.description])
+            compiled = is_valid_env({"PORT": {"regex": "[0-9]+"}}, env)
+        self.assertEqual(timed, get_errors_for(
+            env, [self.description, self.description]))
+        self.assertEqual(compiled, [["PORT", ["regex"]]])
+
+    def test_stats(self):
+        with timing_hook(Stats()) as stats:
+            get_errors_for({"PORT": "80", "HOST": "db"}, [self.description])
+            is_valid_env({"PORT": {"regex": "[0-9]+"}}, {"PORT": "80"})
+        self.assertEqual({name: len(seconds) for name, seconds in stats.rules.items()},
+                         {"is_int": 1, "regex": 3, "min_length": 1})
+        self.assertEqual(
+            {key for key, _ in stats.slowest_keys()}, {"PORT", "HOST"})
+        self.assertEqual(list(stats.files[self.description]), [
+                         "load", "compile"])
+        report = stats.report()
+        self.assertIn("regex", report)
+        self.assertIn(self.description, report)
+
+    def test_cli(self):
+        completed = subprocess.run(
+            [sys.executable, "-m", "env_should_be.cli", "-d",
+                self.description, "--stats", "--coerce"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PORT": "80", "HOST": "db"},
+        )
+        self.assertEqual(completed.returncode, 0)
+        self.assertTrue(completed.stderr.startswith("stats: "))
+        self.assertIn("slowest keys:", completed.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
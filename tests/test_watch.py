@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from env_should_be.esb import write_esb
+from env_should_be.exception import DescriptionFileNotLoading
+from env_should_be.utils import compile_description
+from env_should_be.watch import *
+
+
+class StopWatching(Exception):
+    pass
+
+
+def watch_in_thread(descriptions, env_file, env) -> tuple[threading.Thread, list]:
+    "Runs watch() until it reports once, the reported transitions end up in the list."
+    reported = []
+
+    def report(transitions):
+        reported.extend(transitions)
+        raise StopWatching()
+
+    def run():
+        try:
+            watch(descriptions, env_file, env, report,
+                  on_error=reported.append, interval=0.01)
+        except StopWatching:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    # let the watcher start before anything changes
+    time.sleep(0.2)
+    return thread, reported
+
+
+class TestWatchState(unittest.TestCase):
+    description = {
+        "DB_USER": {"length": 6},
+        "DB_HOST": {"option": ["localhost"]},
+        "DB_PORT": {"regex": "^[0-9]+$", "required": False},
+    }
+    env = {"DB_USER": "myuser", "DB_HOST": "localhost"}
+
+    def setUp(self):
+        self.state = WatchState(
+            dict(self.env), {"app.json": dict(self.description)})
+        self.state.evaluations = 0
+
+    def test_env_change_only_checks_touched_keys(self):
+        transitions = self.state.update_env({**self.env, "DB_USER": "me"})
+        self.assertEqual(transitions, [Transition(
+            "app.json", "DB_USER", ["length"])])
+        self.assertEqual(self.state.evaluations, 1)
+
+        transitions = self.state.update_env(
+            {**self.env, "DB_USER": "me", "UNRELATED": "x"})
+        self.assertEqual(transitions, [])
+        self.assertEqual(self.state.evaluations, 1)
+
+        transitions = self.state.update_env(dict(self.env))
+        self.assertEqual(transitions, [Transition("app.json", "DB_USER", [])])
+
+    def test_description_change_only_checks_touched_keys(self):
+        transitions = self.state.update_description(
+            "app.json", {**self.description, "DB_HOST": {"option": ["db"]}}
+        )
+        self.assertEqual(transitions, [Transition(
+            "app.json", "DB_HOST", ["option"])])
+        self.assertEqual(self.state.evaluations, 1)
+
+        transitions = self.state.update_description(
+            "app.json", {"DB_USER": {"length": 6}})
+        self.assertEqual(transitions, [Transition("app.json", "DB_HOST", [])])
+
+    def test_missing_required_is_a_failure(self):
+        env = dict(self.env)
+        del env["DB_HOST"]
+        transitions = self.state.update_env(env)
+        self.assertEqual(transitions, [Transition(
+            "app.json", "DB_HOST", ["required"])])
+
+    def test_rechecks_keep_the_regex_budget(self):
+        state = WatchState({"NAME": "aaaa"}, {"app.json": {"NAME": {"regex": "^(a+)+$"}}},
+                           regex_timeout=0.2)
+        transitions = state.update_env({"NAME": "a" * 64 + "!"})
+        self.assertEqual(transitions, [Transition(
+            "app.json", "NAME", ["regex:timeout"])])
+
+
+class TestWatchers(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, ".env")
+        with open(self.path, "w") as file:
+            file.write("A=1\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assert_detects_change(self, watcher):
+        def touch():
+            time.sleep(0.05)
+            with open(self.path, "w") as file:
+                file.write("A=2\n")
+            os.utime(self.path, ns=(0, 10**9))
+
+        thread = threading.Thread(target=touch)
+        thread.start()
+        try:
+            self.assertEqual(watcher.wait(), {self.path})
+        finally:
+            thread.join()
+            watcher.close()
+
+    def test_polling(self):
+        self.assert_detects_change(PollingWatcher([self.path], interval=0.01))
+
+    def test_default_watcher(self):
+        self.assert_detects_change(get_watcher([self.path], interval=0.01))
+
+    def test_truncated_description(self):
+        description = os.path.join(self.tmp_dir, "app.yml")
+        with open(description, "w") as file:
+            file.write("A:\n  regex: ^1$\n")
+        thread, reported = watch_in_thread(
+            [description], self.path, {"A": "1"})
+        open(description, "w").close()
+        os.utime(description, ns=(0, 10**9))
+        time.sleep(0.3)
+        # the last good description still applies
+        self.assertTrue(thread.is_alive())
+        with open(self.path, "w") as file:
+            file.write("A=2\n")
+        os.utime(self.path, ns=(0, 2 * 10**9))
+        thread.join(5)
+        self.assertIsInstance(reported[0], DescriptionFileNotLoading)
+        self.assertEqual(
+            reported[1:], [Transition(description, "A", ["regex"])])
+
+    def test_base_of_a_description(self):
+        base = os.path.join(self.tmp_dir, "base.json")
+        description = os.path.join(self.tmp_dir, "app.json")
+        with open(base, "w") as file:
+            json.dump({"A": {"regex": "^1$"}}, file)
+        with open(description, "w") as file:
+            json.dump({"extends": "base.json", "B": {"required": False}}, file)
+        thread, reported = watch_in_thread(
+            [description], self.path, {"A": "1"})
+        with open(base, "w") as file:
+            json.dump({"A": {"regex": "^2$"}}, file)
+        os.utime(base, ns=(0, 10**9))
+        thread.join(5)
+        self.assertEqual(reported, [Transition(description, "A", ["regex"])])
+
+    def test_compiled_description(self):
+        description = os.path.join(self.tmp_dir, "desc.esb")
+        write_esb(description, compile_description({"A": {"regex": "^1$"}}))
+        thread, reported = watch_in_thread(
+            [description], self.path, {"A": "1"})
+        with open(self.path, "w") as file:
+            file.write("A=2\n")
+        os.utime(self.path, ns=(0, 10**9))
+        thread.join(5)
+        self.assertEqual(reported, [Transition(description, "A", ["regex"])])
+
+
+if __name__ == "__main__":
+    unittest.main()